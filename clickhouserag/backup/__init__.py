@@ -3,7 +3,9 @@ from enum import Enum
 
 class BackupFormat(Enum):
     JSON = "json"
+    NDJSON = "ndjson"
     PARQUET = "parquet"
     PROTOBYTE = "protobyte"
     CSV = "csv"
     EXCEL = "excel"
+    NATIVE = "native"
@@ -0,0 +1,174 @@
+"""Arrow conversion helpers for Clickhouse backups and Arrow inserts.
+
+This module requires ``pyarrow`` and is only imported once the backup
+manager has checked that it is installed, or by code already holding an
+``ArrowClickhouseClient``.
+"""
+
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+_SIMPLE_TYPES = {
+    "UInt8": pa.uint8(),
+    "UInt16": pa.uint16(),
+    "UInt32": pa.uint32(),
+    "UInt64": pa.uint64(),
+    "Int8": pa.int8(),
+    "Int16": pa.int16(),
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "Float32": pa.float32(),
+    "Float64": pa.float64(),
+    "Bool": pa.bool_(),
+    "String": pa.string(),
+    "Date": pa.date32(),
+    "Date32": pa.date32(),
+    "DateTime": pa.timestamp("s"),
+}
+
+_DECIMAL_PRECISION = {"Decimal32": 9, "Decimal64": 18, "Decimal128": 38}
+
+_WRAPPED_TYPE = re.compile(r"^(\w+)\((.*)\)$")
+
+
+def clickhouse_type_to_arrow(ch_type: str) -> pa.DataType:
+    """Map a Clickhouse column type to an Arrow data type.
+
+    Types without an Arrow counterpart (UUID, IPs, Enums, big integers, ...)
+    are mapped to strings.
+
+    Args:
+    ----
+        ch_type (str): The Clickhouse type, e.g. ``Array(Float32)``.
+
+    Returns:
+    -------
+        pa.DataType: The matching Arrow type.
+    """
+    ch_type = ch_type.strip()
+    if ch_type in _SIMPLE_TYPES:
+        return _SIMPLE_TYPES[ch_type]
+
+    match = _WRAPPED_TYPE.match(ch_type)
+    if not match:
+        return pa.string()
+
+    name, args = match.groups()
+    if name in ("Nullable", "LowCardinality"):
+        return clickhouse_type_to_arrow(args)
+    if name == "Array":
+        return pa.list_(clickhouse_type_to_arrow(args))
+    if name == "DateTime":
+        return pa.timestamp("s")
+    if name == "DateTime64":
+        precision = int(args.split(",")[0])
+        unit = "ms" if precision <= 3 else "us" if precision <= 6 else "ns"
+        return pa.timestamp(unit)
+    if name == "Decimal":
+        precision, scale = (int(arg) for arg in args.split(","))
+        return pa.decimal128(precision, scale)
+    if name in _DECIMAL_PRECISION:
+        return pa.decimal128(_DECIMAL_PRECISION[name], int(args))
+    return pa.string()
+
+
+def build_arrow_schema(columns: List[Tuple[str, str]]) -> pa.Schema:
+    """Build an Arrow schema from Clickhouse column names and types.
+
+    Args:
+    ----
+        columns (List[Tuple[str, str]]): The column names with their Clickhouse types.
+
+    Returns:
+    -------
+        pa.Schema: The Arrow schema.
+    """
+    return pa.schema([(name, clickhouse_type_to_arrow(ch_type)) for name, ch_type in columns])
+
+
+def parquet_column_paths(field: pa.Field) -> List[str]:
+    """Return the Parquet leaf column paths of an Arrow field.
+
+    Per-column Parquet writer options are keyed by these paths, e.g.
+    ``vector.list.element`` for an ``Array(Float32)`` column.
+
+    Args:
+    ----
+        field (pa.Field): The Arrow field.
+
+    Returns:
+    -------
+        List[str]: The dotted leaf column paths.
+    """
+    path, arrow_type = field.name, field.type
+    while pa.types.is_list(arrow_type):
+        path, arrow_type = f"{path}.list.element", arrow_type.value_type
+    return [path]
+
+
+def rows_to_record_batch(rows: List[Tuple], schema: pa.Schema) -> pa.RecordBatch:
+    """Convert a chunk of Clickhouse rows into an Arrow record batch.
+
+    Args:
+    ----
+        rows (List[Tuple]): The rows as returned by the Clickhouse driver.
+        schema (pa.Schema): The target Arrow schema.
+
+    Returns:
+    -------
+        pa.RecordBatch: The rows in columnar form.
+    """
+    columns = zip(*rows) if rows else ([] for _ in schema)
+    return pa.RecordBatch.from_arrays([_to_arrow_array(column, field.type) for column, field in zip(columns, schema)], schema=schema)
+
+
+def _to_arrow_array(values: Tuple, arrow_type: pa.DataType) -> pa.Array:
+    """Convert column values to Arrow, stringifying values Arrow cannot represent."""
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if arrow_type != pa.string():
+            raise
+        return pa.array([None if value is None else str(value) for value in values], type=arrow_type)
+
+
+def vectors_to_arrow(vectors: Sequence[Any]) -> pa.Array:
+    """Convert vectors to an Arrow ``list<float32>`` array.
+
+    Equal-length vectors are stacked into one contiguous float32 buffer and
+    wrapped with computed offsets, without converting each value.
+
+    Args:
+    ----
+        vectors (Sequence[Any]): The vectors, as lists or numpy arrays.
+
+    Returns:
+    -------
+        pa.Array: The vectors as an Arrow list array.
+    """
+    try:
+        matrix = np.asarray(vectors, dtype=np.float32)
+    except ValueError:
+        matrix = None
+    if matrix is None or matrix.ndim != 2 or not matrix.shape[1]:
+        return pa.array([np.asarray(vector, dtype=np.float32) for vector in vectors], type=pa.list_(pa.float32()))
+    offsets = np.arange(0, matrix.size + 1, matrix.shape[1], dtype=np.int32)
+    return pa.ListArray.from_arrays(pa.array(offsets), pa.array(matrix.ravel()))
+
+
+def columns_to_arrow(columns: Dict[str, Sequence[Any]], vector_columns: Tuple[str, ...] = ("vector",)) -> pa.Table:
+    """Build an Arrow table from column values, converting vector columns in bulk.
+
+    Args:
+    ----
+        columns (Dict[str, Sequence[Any]]): The values of each column, keyed by column name.
+        vector_columns (Tuple[str, ...]): The columns holding float vectors.
+
+    Returns:
+    -------
+        pa.Table: The columns as an Arrow table, other types are inferred by Arrow.
+    """
+    return pa.table({name: vectors_to_arrow(values) if name in vector_columns else pa.array(values) for name, values in columns.items()})
@@ -1,68 +1,121 @@
+import csv
+import importlib.util
 import logging
-from typing import Dict, Optional
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
 from clickhouserag.backup import BackupFormat
 from clickhouserag.clickhouse.base import ClickhouseClient
+from clickhouserag.clickhouse.clients import ArrowClickhouseClient
 from clickhouserag.clickhouse.managers import ClickhouseTableManager
+from clickhouserag.rag.schema import create_table_query, insert_columns
 from clickhouserag.utils import (
+    batched,
     check_installed,
     get_format_from_path,
-    load_json,
-    save_json,
+    load_json_array,
+    load_ndjson,
+    prefetch,
+    records_to_columns,
+    save_json_array,
+    save_ndjson,
 )
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+PREFETCH_BLOCKS = 4
+PARQUET_ROW_GROUP_BYTES = 128 * 1024 * 1024
+PARQUET_ROW_GROUP_ROWS = 1_000_000
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+PARQUET_ZSTD_LEVEL = 3
+PARQUET_RESTORE_BATCH_SIZE = 65536
+CSV_CHUNK_SIZE = 65536
+NDJSON_CHUNK_SIZE = 65536
+JSON_RESTORE_BATCH_SIZE = 50_000
+EXCEL_MAX_ROWS = 1048576
+# Keep 64-bit integers as JSON numbers so restores insert them without conversion.
+JSON_EXPORT_SETTINGS = {"output_format_json_quote_64bit_integers": 0}
+EXCEL_NATIVE_TYPES = ("UInt", "Int", "Float", "Decimal", "Bool", "String", "FixedString", "Date", "Enum")
+
 
 class BackupManager:
     """Class to manage backup operations for RAG data."""
 
-    def __init__(self, client: ClickhouseClient, table_manager: ClickhouseTableManager) -> None:
+    def __init__(
+        self,
+        client: ClickhouseClient,
+        table_manager: ClickhouseTableManager,
+        quantize_vectors: bool = False,
+        binary_vectors: bool = False,
+        vector_index_dimensions: Optional[int] = None,
+    ) -> None:
         """Initialize the BackupManager.
 
         Args:
         ----
             client (ClickhouseClient): The Clickhouse client.
             table_manager (ClickhouseTableManager): The table manager instance.
+            quantize_vectors (bool): Whether restored tables get the int8 quantized vector columns.
+            binary_vectors (bool): Whether restored tables get the packed sign bits of the vectors.
+            vector_index_dimensions (Optional[int]): The vector length of the HNSW index of restored tables, None for no index.
         """
         self.client = client
         self.table_manager = table_manager
+        self.quantize_vectors = quantize_vectors
+        self.binary_vectors = binary_vectors
+        self.vector_index_dimensions = vector_index_dimensions
         self.logger = logging.getLogger(__name__)
+        self._table_exists_cache: Optional[bool] = None
 
         self._backup_handlers = {
             BackupFormat.JSON: self._backup_to_json,
+            BackupFormat.NDJSON: self._backup_to_ndjson,
             BackupFormat.PARQUET: self._backup_to_parquet,
             BackupFormat.PROTOBYTE: self._backup_to_protobyte,
             BackupFormat.CSV: self._backup_to_csv,
             BackupFormat.EXCEL: self._backup_to_excel,
+            BackupFormat.NATIVE: self._backup_to_native,
         }
 
         self._restore_handlers = {
             BackupFormat.JSON: self._restore_from_json,
+            BackupFormat.NDJSON: self._restore_from_ndjson,
             BackupFormat.PARQUET: self._restore_from_parquet,
             BackupFormat.PROTOBYTE: self._restore_from_protobyte,
             BackupFormat.CSV: self._restore_from_csv,
             BackupFormat.EXCEL: self._restore_from_excel,
+            BackupFormat.NATIVE: self._restore_from_native,
         }
 
-    def backup_to_file(self, path: str) -> None:
+    def backup_to_file(self, path: str, max_workers: int = 1) -> None:
         """Backup the RAG database to a file.
 
         Args:
         ----
             path (str): The file path to save the backup.
+            max_workers (int): Number of threads encoding a Parquet backup. With more than one
+                worker, ``path`` becomes a directory holding one Parquet file per row group.
 
         Raises:
         ------
             ValueError: If an unsupported format is specified.
             RuntimeError: If the backup operation fails.
         """
-        backup_format = get_format_from_path(path)
-        handler = self._backup_handlers.get(BackupFormat(backup_format))
-        if handler:
-            handler(path)
-        else:
+        backup_format = BackupFormat(get_format_from_path(path))
+        handler = self._backup_handlers.get(backup_format)
+        if not handler:
             raise ValueError(f"Unsupported file extension for backup: {path}")
+        if max_workers > 1:
+            if backup_format != BackupFormat.PARQUET:
+                raise ValueError(f"Parallel backups are only supported for Parquet: {path}")
+            handler(path, max_workers=max_workers)
+        else:
+            handler(path)
 
     def restore_from_file(self, path: str, table_schema: Optional[Dict[str, str]] = None, engine: str = "MergeTree", order_by: str = "id") -> None:
         """Restore the RAG database from a file.
@@ -81,56 +134,231 @@ class BackupManager:
         """
         backup_format = get_format_from_path(path)
         handler = self._restore_handlers.get(BackupFormat(backup_format))
-        if handler:
-            handler(path, table_schema, engine, order_by)
-        else:
+        if not handler:
             raise ValueError(f"Unsupported file extension for restore: {path}")
+        try:
+            handler(path, table_schema, engine, order_by)
+        except Exception:
+            # The table may have been dropped since it was created, check again on the next restore.
+            self._table_exists_cache = None
+            raise
 
     def _backup_to_json(self, path: str) -> None:
-        data = self.table_manager.fetch_all()
-        save_json(data, path)
+        if isinstance(self.client, ArrowClickhouseClient):
+            # The server encodes the rows, Python only copies the bytes to disk.
+            settings = {**JSON_EXPORT_SETTINGS, "output_format_json_array_of_rows": 1}
+            self.client.export_raw(f"SELECT * FROM {self.table_manager.table_name}", path, fmt="JSONEachRow", settings=settings)
+        else:
+            columns, chunks = self._fetch_blocks()
+            names = [name for name, _ in columns]
+            save_json_array((dict(zip(names, row)) for rows in chunks for row in rows), path)
         self.logger.info(f"Database backup created at {path} in JSON format")
 
-    def _backup_to_parquet(self, path: str) -> None:
-        check_installed("pyarrow", "fastparquet")
-        data = self.table_manager.fetch_all()
-        df = pd.DataFrame(data)
-        df.to_parquet(path, engine="pyarrow")
+    def _backup_to_ndjson(self, path: str) -> None:
+        if isinstance(self.client, ArrowClickhouseClient):
+            self.client.export_raw(f"SELECT * FROM {self.table_manager.table_name}", path, fmt="JSONEachRow", settings=JSON_EXPORT_SETTINGS)
+        else:
+            columns, chunks = self._fetch_blocks()
+            names = [name for name, _ in columns]
+            save_ndjson((dict(zip(names, row)) for rows in chunks for row in rows), path)
+        self.logger.info(f"Database backup created at {path} in NDJSON format")
+
+    def _backup_to_parquet(self, path: str, max_workers: int = 1) -> None:
+        check_installed("pyarrow")
+        import pyarrow.parquet as pq
+
+        if isinstance(self.client, ArrowClickhouseClient):
+            # The server already encodes Arrow, so no row is ever materialised in Python.
+            table = self.client.fetch_all_arrow(f"SELECT * FROM {self.table_manager.table_name}")
+            schema = table.schema
+            row_groups = (table.slice(offset, PARQUET_ROW_GROUP_ROWS) for offset in range(0, table.num_rows, PARQUET_ROW_GROUP_ROWS))
+        else:
+            from clickhouserag.backup.arrow import build_arrow_schema
+
+            columns, chunks = self._fetch_blocks()
+            schema = build_arrow_schema(columns)
+            row_groups = self._iter_row_groups(chunks, schema)
+
+        options = self._parquet_options(schema)
+        if max_workers > 1:
+            self._write_parquet_shards(path, row_groups, schema, options, max_workers)
+        else:
+            with pq.ParquetWriter(path, schema, **options) as writer:
+                for table in row_groups:
+                    writer.write_table(table, row_group_size=table.num_rows)
         self.logger.info(f"Database backup created at {path} in Parquet format")
 
+    @staticmethod
+    def _parquet_options(schema: "pa.Schema") -> Dict[str, Any]:
+        """Build the Parquet writer options for a backup with the given schema."""
+        import pyarrow as pa
+
+        from clickhouserag.backup.arrow import parquet_column_paths
+
+        # Float embeddings barely shrink under zstd, so they keep the cheaper snappy codec.
+        compression = {}
+        for field in schema:
+            is_embedding = pa.types.is_list(field.type) and pa.types.is_floating(field.type.value_type)
+            for column_path in parquet_column_paths(field):
+                compression[column_path] = "snappy" if is_embedding else "zstd"
+        compression_level = {name: PARQUET_ZSTD_LEVEL for name, codec in compression.items() if codec == "zstd"}
+        return {
+            "compression": compression,
+            "compression_level": compression_level or None,
+            "use_dictionary": True,
+            "data_page_size": PARQUET_DATA_PAGE_SIZE,
+            "write_statistics": True,
+        }
+
+    @staticmethod
+    def _iter_row_groups(chunks: Iterator[List[Tuple]], schema: "pa.Schema") -> Iterator["pa.Table"]:
+        """Buffer streamed blocks into tables sized for Parquet row groups."""
+        import pyarrow as pa
+
+        from clickhouserag.backup.arrow import rows_to_record_batch
+
+        pending, pending_rows, pending_bytes = [], 0, 0
+        for rows in chunks:
+            batch = rows_to_record_batch(rows, schema)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            pending_bytes += batch.nbytes
+            if pending_bytes >= PARQUET_ROW_GROUP_BYTES or pending_rows >= PARQUET_ROW_GROUP_ROWS:
+                yield pa.Table.from_batches(pending, schema)
+                pending, pending_rows, pending_bytes = [], 0, 0
+        if pending:
+            yield pa.Table.from_batches(pending, schema)
+
+    @staticmethod
+    def _write_parquet_shards(path: str, row_groups: Iterator["pa.Table"], schema: "pa.Schema", options: Dict[str, Any], max_workers: int) -> None:
+        """Write each row group to its own file of a Parquet dataset directory, encoding files in parallel.
+
+        Arrow releases the GIL while compressing, so worker threads scale with cores.
+        At most ``max_workers`` row groups are held in memory at once.
+        """
+        import pyarrow.parquet as pq
+
+        os.makedirs(path, exist_ok=True)
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            shard = -1
+            for shard, table in enumerate(row_groups):
+                if len(pending) >= max_workers:
+                    pending.popleft().result()
+                shard_path = os.path.join(path, f"part-{shard:05d}.parquet")
+                pending.append(executor.submit(pq.write_table, table, shard_path, row_group_size=table.num_rows, **options))
+            if shard < 0:
+                # Keep the schema readable even when the table is empty.
+                pq.write_table(schema.empty_table(), os.path.join(path, "part-00000.parquet"), **options)
+            for future in pending:
+                future.result()
+
     def _backup_to_protobyte(self, path: str) -> None:
         check_installed("protobuf")
         # TODO Implement protobuf serialization
         raise ValueError("Protobuf serialization is not implemented yet")
 
     def _backup_to_csv(self, path: str) -> None:
-        data = self.table_manager.fetch_all()
-        df = pd.DataFrame(data)
-        df.to_csv(path, index=False)
+        columns, chunks = self._fetch_blocks()
+        schema = self._arrow_csv_schema(columns)
+        if schema is not None:
+            self._write_csv_arrow(path, chunks, schema)
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow([name for name, _ in columns])
+                for rows in chunks:
+                    writer.writerows(rows)
         self.logger.info(f"Database backup created at {path} in CSV format")
 
+    @staticmethod
+    def _arrow_csv_schema(columns: List[Tuple[str, str]]) -> Optional["pa.Schema"]:
+        """Return the Arrow schema of the table if pyarrow is installed and can write all its columns to CSV."""
+        if importlib.util.find_spec("pyarrow") is None:
+            return None
+        import pyarrow as pa
+
+        from clickhouserag.backup.arrow import build_arrow_schema
+
+        schema = build_arrow_schema(columns)
+        # The Arrow CSV writer has no representation for arrays such as embeddings.
+        if any(pa.types.is_nested(field.type) for field in schema):
+            return None
+        return schema
+
+    @staticmethod
+    def _write_csv_arrow(path: str, chunks: Iterator[List[Tuple]], schema: "pa.Schema") -> None:
+        """Write streamed blocks with Arrow's C++ CSV writer, which formats values without Python calls per cell."""
+        import pyarrow.csv as pa_csv
+
+        from clickhouserag.backup.arrow import rows_to_record_batch
+
+        options = pa_csv.WriteOptions(quoting_style="needed")
+        with pa_csv.CSVWriter(path, schema, write_options=options) as writer:
+            for rows in chunks:
+                writer.write_batch(rows_to_record_batch(rows, schema))
+
     def _backup_to_excel(self, path: str) -> None:
-        data = self.table_manager.fetch_all()
-        df = pd.DataFrame(data)
-        df.to_excel(path, index=False)
+        check_installed("xlsxwriter")
+        import xlsxwriter
+
+        columns, chunks = self._fetch_blocks()
+        # Excel cells cannot hold arrays, tuples, maps or UUIDs, so those columns are written as text.
+        as_text = [i for i, (_, ch_type) in enumerate(columns) if not ch_type.startswith(EXCEL_NATIVE_TYPES)]
+        options = {"constant_memory": True, "use_zip64": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"}
+        with xlsxwriter.Workbook(path, options) as workbook:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, [name for name, _ in columns])
+            row_number = 0
+            for rows in chunks:
+                for row in rows:
+                    row_number += 1
+                    if row_number >= EXCEL_MAX_ROWS:
+                        raise ValueError(f"Table has more rows than an Excel sheet can hold ({EXCEL_MAX_ROWS}), use Parquet or CSV instead")
+                    if as_text:
+                        row = list(row)
+                        for i in as_text:
+                            row[i] = None if row[i] is None else str(row[i])
+                    worksheet.write_row(row_number, 0, row)
         self.logger.info(f"Database backup created at {path} in Excel format")
 
+    def _backup_to_native(self, path: str) -> None:
+        """Dump the table in Clickhouse's Native format, streaming server bytes straight to disk."""
+        self._require_arrow_client("Native")
+        self.client.export_raw(f"SELECT * FROM {self.table_manager.table_name}", path, fmt="Native")
+        self.logger.info(f"Database backup created at {path} in Native format")
+
     def _restore_from_json(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
         if table_schema:
             self._initialize_table(table_schema, engine, order_by)
-        data = load_json(path)
         self.table_manager.reset_table()
-        self.table_manager.insert(data)
+        columns = self._insert_columns(table_schema, engine)
+        for data in batched(load_json_array(path), JSON_RESTORE_BATCH_SIZE):
+            self._insert_records(data, columns)
         self.logger.info(f"Database restored from {path} in JSON format")
 
+    def _restore_from_ndjson(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
+        if table_schema:
+            self._initialize_table(table_schema, engine, order_by)
+        self.table_manager.reset_table()
+        columns = self._insert_columns(table_schema, engine)
+        for data in batched(load_ndjson(path), NDJSON_CHUNK_SIZE):
+            self._insert_records(data, columns)
+        self.logger.info(f"Database restored from {path} in NDJSON format")
+
     def _restore_from_parquet(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
-        check_installed("pyarrow", "fastparquet")
+        check_installed("pyarrow")
+        import pyarrow.parquet as pq
+
         if table_schema:
             self._initialize_table(table_schema, engine, order_by)
-        df = pd.read_parquet(path, engine="pyarrow")
-        data = df.to_dict(orient="records")
+        # Only read the columns the target table accepts, engine columns such as version and is_deleted included.
+        file_columns = set(pq.read_schema(path).names)
+        columns = [column for column in self._insert_columns(table_schema, engine) if column in file_columns]
+        table = pq.read_table(path, columns=columns, use_threads=True)
         self.table_manager.reset_table()
-        self.table_manager.insert(data)
+        for batch in table.to_batches(max_chunksize=PARQUET_RESTORE_BATCH_SIZE):
+            self.table_manager.insert_columnar({name: column.to_pylist() for name, column in zip(batch.schema.names, batch.columns)})
         self.logger.info(f"Database restored from {path} in Parquet format")
 
     def _restore_from_protobyte(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
@@ -141,48 +369,64 @@ class BackupManager:
     def _restore_from_csv(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
         if table_schema:
             self._initialize_table(table_schema, engine, order_by)
-        df = pd.read_csv(path)
-        data = df.to_dict(orient="records")
         self.table_manager.reset_table()
-        self.table_manager.insert(data)
+        for df in pd.read_csv(path, chunksize=CSV_CHUNK_SIZE):
+            self._insert_dataframe(df)
         self.logger.info(f"Database restored from {path} in CSV format")
 
     def _restore_from_excel(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
         if table_schema:
             self._initialize_table(table_schema, engine, order_by)
         df = pd.read_excel(path)
-        data = df.to_dict(orient="records")
         self.table_manager.reset_table()
-        self.table_manager.insert(data)
+        self._insert_dataframe(df)
         self.logger.info(f"Database restored from {path} in Excel format")
 
+    def _restore_from_native(self, path: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
+        self._require_arrow_client("Native")
+        if table_schema:
+            self._initialize_table(table_schema, engine, order_by)
+        self.table_manager.reset_table()
+        self.client.import_raw(self.table_manager.table_name, path, fmt="Native")
+        self.logger.info(f"Database restored from {path} in Native format")
+
+    def _require_arrow_client(self, backup_format: str) -> None:
+        if not isinstance(self.client, ArrowClickhouseClient):
+            raise ValueError(f"{backup_format} backups require an ArrowClickhouseClient")
+
+    def _insert_columns(self, table_schema: Optional[Dict[str, str]], engine: str) -> List[str]:
+        """Return the columns restored records may set, from the schema or else from the table."""
+        return insert_columns(table_schema, engine) if table_schema else self.table_manager.column_names()
+
+    def _insert_records(self, records: List[Dict[str, Any]], columns: List[str]) -> None:
+        """Insert records column by column."""
+        if records:
+            self.table_manager.insert_columnar(records_to_columns(records, columns))
+
+    def _insert_dataframe(self, df: pd.DataFrame) -> None:
+        """Insert a DataFrame column by column, without building a dict per row."""
+        self.table_manager.insert_columnar({column: df[column].tolist() for column in df.columns})
+
+    def _fetch_blocks(self) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream the table, fetching the next blocks while the current one is being written."""
+        columns, chunks = self.table_manager.fetch_iter()
+        return columns, prefetch(chunks, maxsize=PREFETCH_BLOCKS)
+
     def _initialize_table(self, table_schema: Dict[str, str], engine: str, order_by: str) -> None:
-        """Initialize the table in Clickhouse based on the provided schema if it does not exist."""
-        try:
-            if not self._check_table_exists():
-                self._create_table(table_schema, engine, order_by)
-            else:
-                self.logger.info("Table already exists.")
-        except Exception as e:
-            self.logger.exception(f"Error initializing table: {e}")
+        """Initialize the table in Clickhouse based on the provided schema unless it is known to exist."""
+        if not self._table_exists_cache:
+            self._create_table(table_schema, engine, order_by)
 
     def _create_table(self, table_schema: Dict[str, str], engine: str, order_by: str) -> None:
-        """Create a table in Clickhouse based on the provided schema."""
+        """Create the table in Clickhouse based on the provided schema if it does not exist yet."""
         try:
-            fields = ", ".join([f"{name} {dtype}" for name, dtype in table_schema.items()])
-            query = f"CREATE TABLE ({fields}) ENGINE = {engine} ORDER BY {order_by}"
+            query = create_table_query(
+                self.table_manager.table_name, table_schema, engine, order_by, self.quantize_vectors, self.vector_index_dimensions, self.binary_vectors
+            )
             self.client.execute_query(query)
-            self.logger.info(f"Table created with schema: {table_schema}, engine: {engine}, order by: {order_by}")
+            self.logger.info(f"Table ensured with schema: {table_schema}, engine: {engine}, order by: {order_by}")
+            self._table_exists_cache = True
         except Exception as e:
+            self._table_exists_cache = None
             self.logger.error(f"Failed to create table: {e}")
             raise RuntimeError("Failed to create table") from e
-
-    def _check_table_exists(self) -> bool:
-        """Check if the table exists in the database."""
-        query = "EXISTS TABLE"
-        try:
-            result = self.client.execute_query(query)
-            return result[0][0] == 1
-        except Exception as e:
-            self.logger.error(f"Failed to check if table exists: {e}")
-            raise RuntimeError("Failed to check if table exists") from e
@@ -1,7 +1,7 @@
 """Abstract client module for Clickhouse."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 
 class ClickhouseClient(ABC):
@@ -23,7 +23,7 @@ class ClickhouseClient(ABC):
         pass
 
     @abstractmethod
-    def fetch_all(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def fetch_all(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[NamedTuple]:
         """Fetch all results from the Clickhouse database."""
         pass
 
@@ -32,6 +32,18 @@ class ClickhouseClient(ABC):
         """Fetch a specific column from the Clickhouse database."""
         pass
 
+    @abstractmethod
+    def insert_columnar(self, table: str, columns: Dict[str, List[Any]]) -> None:
+        """Insert column-oriented data into a table in the Clickhouse database."""
+        pass
+
+    @abstractmethod
+    def execute_iter(
+        self, query: str, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None, chunk_size: int = 65536
+    ) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream results from the Clickhouse database in chunks of rows."""
+        pass
+
     @abstractmethod
     def close(self) -> None:
         """Close the connection to the Clickhouse database."""
@@ -54,10 +66,15 @@ class ClickhouseTable(ABC):
         self.table_name = table_name
 
     @abstractmethod
-    def insert(self, values: List[Dict[str, Any]]) -> None:
+    def insert(self, values: Iterable[Dict[str, Any]]) -> None:
         """Insert values into the table."""
         pass
 
+    @abstractmethod
+    def insert_columnar(self, columns: Dict[str, List[Any]]) -> None:
+        """Insert column-oriented values into the table."""
+        pass
+
     @abstractmethod
     def update(self, values: Dict[str, Any], conditions: Dict[str, Any]) -> None:
         """Update values in the table based on conditions."""
@@ -71,17 +88,24 @@ class ClickhouseTable(ABC):
     @abstractmethod
     def search(
         self, query: str, params: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NamedTuple]:
         """Search the table based on a query."""
         pass
 
     @abstractmethod
     def fetch_all(
         self, params: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NamedTuple]:
         """Fetch all values from the table."""
         pass
 
+    @abstractmethod
+    def fetch_iter(
+        self, chunk_size: int = 65536
+    ) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream all values from the table in chunks of rows."""
+        pass
+
     @abstractmethod
     def reset_table(self) -> None:
         """Reset the table."""
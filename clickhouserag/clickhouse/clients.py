@@ -1,18 +1,108 @@
 """Clickhouse client module for Clickhouse data access."""
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import os
+import queue
+import re
+import shutil
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from keyword import iskeyword
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
+import numpy as np
 from clickhouse_driver import Client, errors
 
 from clickhouserag.clickhouse.base import ClickhouseClient
+from clickhouserag.utils import batched, check_installed
 from clickhouserag.utils.connection import ensure_connection
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+DEFAULT_BLOCK_SIZE = 65536
+DEFAULT_SETTINGS = {"connect_timeout_with_failover_ms": 50}
+RAW_COPY_BUFFER_SIZE = 1 << 20
+
+_INSERT_TABLE = re.compile(r"^\s*INSERT\s+INTO\s+(\S+)", re.IGNORECASE)
+_SELECT_QUERY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+\S+(\s*,\s*\S+)?(\s+OFFSET\s+\S+)?\s*$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=128)
+def _row_class(columns: Tuple[str, ...]) -> Optional[Type[NamedTuple]]:
+    """Build (once per distinct column list) the named tuple class used for result rows.
+
+    Returns None when a column name cannot be a field name (``_id``,
+    ``order``, duplicates), instead of renaming it to ``_0`` and so on.
+    """
+    valid = all(name.isidentifier() and not iskeyword(name) and not name.startswith("_") for name in columns)
+    if not valid or len(set(columns)) != len(columns):
+        return None
+    return namedtuple("Row", columns)
+
+
+def _make_rows(columns: Tuple[str, ...], rows: Iterable[Sequence[Any]]) -> List[Tuple]:
+    """Turn result rows into named tuples, or plain tuples when the columns cannot be field names."""
+    row_class = _row_class(columns)
+    return list(map(row_class._make, rows)) if row_class else list(map(tuple, rows))
+
+
+def _column_values(values: Any) -> Union[list, tuple]:
+    """Convert a column to a list of plain Python values in one vectorised step.
+
+    Inserts run with ``types_check=False``, so the driver does not coerce
+    values one by one. numpy arrays and pandas Series are converted here
+    instead, with datetimes cast to microseconds so they become ``datetime`` objects.
+    """
+    if isinstance(values, (list, tuple)):
+        return values
+    if not hasattr(values, "dtype"):
+        return list(values)
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        values = values.astype("datetime64[us]")
+    return values.tolist()
+
+
+def _limit_one(query: str) -> str:
+    """Wrap a SELECT query so the server returns at most one row, unless it already has a LIMIT."""
+    query = query.strip().rstrip(";")
+    if not _SELECT_QUERY.match(query) or _TRAILING_LIMIT.search(query):
+        return query
+    return f"SELECT * FROM ({query}) LIMIT 1"
+
 
 class ClickhouseConnectClient(ClickhouseClient):
     """Clickhouse client implementation using clickhouse-driver."""
 
-    def __init__(self, host: str, port: int, username: str, password: str, database: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        database: str,
+        pool_size: Optional[int] = None,
+        compression: Union[bool, str] = False,
+        send_receive_timeout: int = 300,
+        sync_request_timeout: int = 5,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
         """Initialize ClickhouseConnectClient.
 
         Args:
@@ -22,25 +112,75 @@ class ClickhouseConnectClient(ClickhouseClient):
             username (str): The username for Clickhouse authentication.
             password (str): The password for Clickhouse authentication.
             database (str): The database to connect to.
+            pool_size (Optional[int]): The number of pooled connections, defaults to the CPU count.
+            compression (Union[bool, str]): The wire compression, e.g. ``"lz4"``
+                (requires ``clickhouse-driver[lz4]``).
+            send_receive_timeout (int): The send/receive socket timeout in seconds.
+            sync_request_timeout (int): The timeout for server pings in seconds.
+            settings (Optional[Dict[str, Any]]): Clickhouse settings applied to every query.
         """
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.database = database
+        self.pool_size = pool_size or os.cpu_count() or 1
+        self.compression = compression
+        self.send_receive_timeout = send_receive_timeout
+        self.sync_request_timeout = sync_request_timeout
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
         self.client: Optional[Client] = None
+        self._clients: List[Client] = []
+        self._pool: "queue.Queue[Client]" = queue.Queue()
         self.logger = logging.getLogger(__name__)
 
     def connect(self) -> None:
-        """Connect to the Clickhouse database."""
+        """Connect to the Clickhouse database and fill the connection pool.
+
+        Pooled clients open their socket on first use and keep it open, so
+        repeated short queries do not pay for a new TCP handshake.
+        """
         try:
-            self.client = Client(host=self.host, port=self.port, user=self.username, password=self.password, database=self.database)
+            self.client = self._create_client()
             self.ping()
+            self._clients = [self.client] + [self._create_client() for _ in range(self.pool_size - 1)]
+            self._pool = queue.Queue()
+            for client in self._clients:
+                self._pool.put(client)
             self.logger.info("Connected to Clickhouse database.")
         except errors.Error as err:
             self.logger.error(f"Failed to connect to Clickhouse: {err}")
             raise ConnectionError(f"Failed to connect to Clickhouse: {err}") from err
 
+    def _create_client(self) -> Client:
+        return Client(
+            host=self.host,
+            port=self.port,
+            user=self.username,
+            password=self.password,
+            database=self.database,
+            compression=self.compression,
+            send_receive_timeout=self.send_receive_timeout,
+            sync_request_timeout=self.sync_request_timeout,
+            settings=self.settings,
+        )
+
+    def _borrow(self) -> Client:
+        """Take a client from the pool, waiting at most the send/receive timeout for one to be free."""
+        try:
+            return self._pool.get(timeout=self.send_receive_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No free Clickhouse connection after {self.send_receive_timeout}s, all {self.pool_size} are busy") from None
+
+    @contextmanager
+    def _acquire(self) -> Iterator[Client]:
+        """Borrow a pooled client for the duration of the block."""
+        client = self._borrow()
+        try:
+            yield client
+        finally:
+            self._pool.put(client)
+
     def ping(self) -> None:
         """Ping the Clickhouse server to check the connection."""
         try:
@@ -50,12 +190,15 @@ class ClickhouseConnectClient(ClickhouseClient):
             raise ConnectionError(f"Ping to Clickhouse failed: {err}") from err
 
     @ensure_connection
-    def _execute(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Tuple]:
+    def _execute(
+        self, query: str, params: Optional[Any] = None, columnar: bool = False, with_column_types: bool = False, types_check: bool = False
+    ) -> Any:
         """Execute a query in the Clickhouse database with error handling."""
         try:
-            if params:
-                return self.client.execute(query, params)
-            return self.client.execute(query)
+            with self._acquire() as client:
+                if params:
+                    return client.execute(query, params, columnar=columnar, with_column_types=with_column_types, types_check=types_check)
+                return client.execute(query, columnar=columnar, with_column_types=with_column_types)
         except errors.Error as err:
             self.logger.error(f"Failed to execute query: {err}")
             raise RuntimeError(f"Failed to execute query: {err}") from err
@@ -64,29 +207,105 @@ class ClickhouseConnectClient(ClickhouseClient):
         """Execute a query in the Clickhouse database."""
         return self._execute(query, params)
 
+    def insert_columnar(self, table: str, columns: Dict[str, List[Any]]) -> None:
+        """Insert column-oriented data into a table using native blocks.
+
+        The driver serialises each column directly into Clickhouse blocks,
+        skipping the per-row dict to tuple conversion of a regular insert.
+        numpy arrays and pandas Series are accepted as columns.
+
+        Args:
+        ----
+            table (str): The name of the table.
+            columns (Dict[str, List[Any]]): The values of each column, keyed by column name.
+        """
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES"
+        data = [_column_values(values) for values in columns.values()]
+        self._execute(query, data, columnar=True, types_check=False)
+
     def fetch_one(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Fetch one result from the Clickhouse database."""
-        result = self._execute(query, params)
-        return dict(result[0]) if result else None
+        """Fetch one result from the Clickhouse database as a dict of column values.
 
-    def fetch_all(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Fetch all results from the Clickhouse database."""
-        return [dict(row) for row in self._execute(query, params)]
+        SELECT queries without a LIMIT are wrapped with ``LIMIT 1``, so only
+        the first row is ever transferred.
+        """
+        rows, columns = self._execute(_limit_one(query), params, with_column_types=True)
+        if not rows:
+            return None
+        return dict(zip((name for name, _ in columns), rows[0]))
+
+    def fetch_all(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[NamedTuple]:
+        """Fetch all results from the Clickhouse database.
+
+        Rows are returned as named tuples sharing one class per column list,
+        use ``row._asdict()`` where a dict is needed. When a column name cannot
+        be a field name (a leading underscore, a keyword or a duplicate), rows
+        are plain tuples in column order instead.
+        """
+        rows, columns = self._execute(query, params, with_column_types=True)
+        return _make_rows(tuple(name for name, _ in columns), rows)
 
     def fetch_column(self, query: str, column: int = 0, params: Optional[Dict[str, Any]] = None) -> List[Any]:
-        """Fetch a specific column from the Clickhouse database."""
-        result = self._execute(query, params)
+        """Fetch a specific column from the Clickhouse database.
+
+        The result is requested column-oriented, so the driver builds the
+        columns while decoding blocks and no per-row Python loop is needed.
+        """
+        result = self._execute(query, params, columnar=True)
         try:
-            return [row[column] for row in result]
+            return list(result[column]) if result else []
         except IndexError as err:
             self.logger.error(f"Column index out of range: {err}")
             raise IndexError(f"Column index out of range: {err}") from None
 
+    @ensure_connection
+    def execute_iter(
+        self, query: str, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None, chunk_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream results from the Clickhouse database in chunks of rows.
+
+        One pooled connection stays busy until the returned iterator is exhausted,
+        closed or garbage collected.
+
+        Args:
+        ----
+            query (str): The query to execute.
+            params (Optional[Dict[str, Any]]): The query parameters.
+            settings (Optional[Dict[str, Any]]): Extra Clickhouse settings for the query.
+            chunk_size (int): The number of rows per chunk, also used as ``max_block_size``.
+
+        Returns:
+        -------
+            Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]: The column names with their
+            Clickhouse types, and an iterator over chunks of rows.
+        """
+        settings = {"max_block_size": chunk_size, **(settings or {})}
+        stream = self._stream(query, params, settings, chunk_size)
+        # Started here, so the stream's cleanup runs even if the caller never iterates it.
+        columns = next(stream)
+        return columns, stream
+
+    def _stream(self, query: str, params: Optional[Dict[str, Any]], settings: Dict[str, Any], chunk_size: int) -> Iterator[Any]:
+        """Yield the column types, then chunks of rows, holding a pooled client until closed or exhausted."""
+        with self._acquire() as client:
+            try:
+                rows = client.execute_iter(query, params, with_column_types=True, settings=settings)
+                yield next(rows, [])
+                yield from batched(rows, chunk_size)
+            except errors.Error as err:
+                self.logger.error(f"Failed to stream query results: {err}")
+                raise RuntimeError(f"Failed to stream query results: {err}") from err
+            except GeneratorExit:
+                # The rest of the result is still on the wire, drop the connection so it is reopened clean.
+                client.disconnect()
+                raise
+
     def close(self) -> None:
         """Close the connection to the Clickhouse database."""
         try:
             if self.client:
-                self.client.disconnect()
+                for client in self._clients or [self.client]:
+                    client.disconnect()
                 self.logger.info("Disconnected from Clickhouse database.")
         except errors.Error as err:
             self.logger.error(f"Failed to close connection: {err}")
@@ -98,3 +317,248 @@ class ClickhouseConnectClient(ClickhouseClient):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class ArrowClickhouseClient(ClickhouseClient):
+    """Clickhouse client implementation using clickhouse-connect over HTTP.
+
+    Results can be fetched as ``pyarrow.Table`` objects decoded in C++, which
+    makes this client the better choice for bulk transfers such as backups.
+    Requires the ``clickhouse-connect`` and ``pyarrow`` packages.
+
+    HTTP connections are kept alive in a connection pool and the client is
+    safe to share between threads, so create one instance per process and
+    reuse it rather than one per request.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        database: str,
+        compress: str = "lz4",
+        pool_size: int = 32,
+        send_receive_timeout: int = 300,
+        keep_interval: int = 30,
+    ):
+        """Initialize ArrowClickhouseClient.
+
+        Args:
+        ----
+            host (str): The host of the Clickhouse server.
+            port (int): The HTTP port of the Clickhouse server.
+            username (str): The username for Clickhouse authentication.
+            password (str): The password for Clickhouse authentication.
+            database (str): The database to connect to.
+            compress (str): The HTTP transfer compression.
+            pool_size (int): The number of kept-alive HTTP connections, at least the expected concurrency.
+            send_receive_timeout (int): The read timeout of HTTP requests in seconds.
+            keep_interval (int): The TCP keepalive probe interval in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.database = database
+        self.compress = compress
+        self.pool_size = pool_size
+        self.send_receive_timeout = send_receive_timeout
+        self.keep_interval = keep_interval
+        self.client = None
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self) -> None:
+        """Connect to the Clickhouse database."""
+        check_installed("clickhouse_connect", "pyarrow")
+        import clickhouse_connect
+        from clickhouse_connect.driver.httputil import get_pool_manager
+
+        try:
+            # A non-blocking pool opens extra connections under bursts instead of waiting for a free one.
+            pool_mgr = get_pool_manager(maxsize=self.pool_size, block=False, keep_interval=self.keep_interval)
+            self.client = clickhouse_connect.get_client(
+                host=self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                database=self.database,
+                compress=self.compress,
+                pool_mgr=pool_mgr,
+                send_receive_timeout=self.send_receive_timeout,
+                # Queries within one session cannot run concurrently, so threads share the client sessionless.
+                autogenerate_session_id=False,
+            )
+            self.logger.info("Connected to Clickhouse database.")
+        except Exception as err:
+            self.logger.error(f"Failed to connect to Clickhouse: {err}")
+            raise ConnectionError(f"Failed to connect to Clickhouse: {err}") from err
+
+    @ensure_connection
+    def _query(self, query: str, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None) -> Any:
+        """Execute a query in the Clickhouse database with error handling."""
+        try:
+            return self.client.query(query, parameters=params, settings=settings)
+        except Exception as err:
+            self.logger.error(f"Failed to execute query: {err}")
+            raise RuntimeError(f"Failed to execute query: {err}") from err
+
+    def execute_query(self, query: str, params: Optional[Any] = None) -> List[Tuple]:
+        """Execute a query in the Clickhouse database.
+
+        Row data passed for an ``INSERT INTO <table> VALUES`` query is sent
+        with a native insert, as clickhouse-connect does not bind it as parameters.
+        """
+        if isinstance(params, list):
+            match = _INSERT_TABLE.match(query)
+            if not match:
+                raise ValueError(f"Row data is only supported for INSERT queries: {query}")
+            if params:
+                columns = list(params[0])
+                self.insert_columnar(match.group(1), {column: [row[column] for row in params] for column in columns})
+            return []
+        return self._query(query, params).result_rows
+
+    def fetch_one(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Fetch one result from the Clickhouse database."""
+        result = self._query(_limit_one(query), params)
+        return dict(zip(result.column_names, result.first_row)) if result.result_rows else None
+
+    def fetch_all(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[NamedTuple]:
+        """Fetch all results from the Clickhouse database as named tuples, or plain tuples like the driver client."""
+        result = self._query(query, params)
+        return _make_rows(tuple(result.column_names), result.result_rows)
+
+    def fetch_all_arrow(self, query: str, params: Optional[Dict[str, Any]] = None) -> "pa.Table":
+        """Fetch all results from the Clickhouse database as an Arrow table.
+
+        The server encodes the result in Arrow format, so no Python object is
+        created per row or value.
+        """
+        try:
+            return self.client.query_arrow(query, parameters=params)
+        except Exception as err:
+            self.logger.error(f"Failed to execute query: {err}")
+            raise RuntimeError(f"Failed to execute query: {err}") from err
+
+    def fetch_column(self, query: str, column: int = 0, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Fetch a specific column from the Clickhouse database."""
+        result = self._query(query, params)
+        try:
+            return list(result.result_columns[column]) if result.result_rows else []
+        except IndexError as err:
+            self.logger.error(f"Column index out of range: {err}")
+            raise IndexError(f"Column index out of range: {err}") from None
+
+    @ensure_connection
+    def export_raw(
+        self, query: str, path: str, fmt: str = "Native", params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Stream a query result in a Clickhouse output format straight into a file.
+
+        The bytes produced by the server are copied as they arrive, without
+        decoding rows in Python.
+
+        Args:
+        ----
+            query (str): The query to execute.
+            path (str): The file path to write.
+            fmt (str): The Clickhouse output format, e.g. ``Native`` or ``RowBinary``.
+            params (Optional[Dict[str, Any]]): The query parameters.
+            settings (Optional[Dict[str, Any]]): Clickhouse settings for the query, e.g. output format options.
+        """
+        try:
+            stream = self.client.raw_stream(query, parameters=params, settings=settings, fmt=fmt)
+            try:
+                with open(path, "wb") as file:
+                    shutil.copyfileobj(stream, file, RAW_COPY_BUFFER_SIZE)
+            finally:
+                stream.close()
+        except Exception as err:
+            self.logger.error(f"Failed to export query results: {err}")
+            raise RuntimeError(f"Failed to export query results: {err}") from err
+
+    @ensure_connection
+    def import_raw(self, table: str, path: str, fmt: str = "Native") -> None:
+        """Stream a file in a Clickhouse input format into a table.
+
+        Args:
+        ----
+            table (str): The name of the table.
+            path (str): The file path to read.
+            fmt (str): The Clickhouse input format of the file.
+        """
+        try:
+            with open(path, "rb") as file:
+                self.client.raw_insert(table, insert_block=file, fmt=fmt)
+        except Exception as err:
+            self.logger.error(f"Failed to import into {table}: {err}")
+            raise RuntimeError(f"Failed to import into {table}: {err}") from err
+
+    @ensure_connection
+    def insert_arrow(self, table: str, arrow_table: "pa.Table") -> None:
+        """Insert an Arrow table, sent to the server in Arrow format.
+
+        Column buffers are written as they are, so ``Array(Float32)`` vectors
+        backed by one contiguous float32 buffer skip per-value serialization.
+
+        Args:
+        ----
+            table (str): The name of the table.
+            arrow_table (pa.Table): The rows to insert, with columns named after the table columns.
+        """
+        try:
+            self.client.insert_arrow(table, arrow_table)
+        except Exception as err:
+            self.logger.error(f"Failed to insert into {table}: {err}")
+            raise RuntimeError(f"Failed to insert into {table}: {err}") from err
+
+    @ensure_connection
+    def insert_columnar(self, table: str, columns: Dict[str, List[Any]]) -> None:
+        """Insert column-oriented data into a table using native blocks."""
+        try:
+            self.client.insert(table, list(columns.values()), column_names=list(columns), column_oriented=True)
+        except Exception as err:
+            self.logger.error(f"Failed to insert into {table}: {err}")
+            raise RuntimeError(f"Failed to insert into {table}: {err}") from err
+
+    @ensure_connection
+    def execute_iter(
+        self, query: str, params: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None, chunk_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream results from the Clickhouse database in chunks of rows."""
+        settings = {"max_block_size": chunk_size, **(settings or {})}
+        try:
+            stream = self.client.query_row_block_stream(query, parameters=params, settings=settings)
+        except Exception as err:
+            self.logger.error(f"Failed to execute query: {err}")
+            raise RuntimeError(f"Failed to execute query: {err}") from err
+        chunks = self._iter_chunks(stream, chunk_size)
+        # Started here, so the HTTP response is closed even if the caller never iterates the chunks.
+        columns = next(chunks)
+        return columns, chunks
+
+    def _iter_chunks(self, stream: Any, chunk_size: int) -> Iterator[Any]:
+        """Yield the column types, then regroup streamed blocks into chunks with error handling."""
+        try:
+            with stream:
+                source = stream.source
+                yield [(name, ch_type.name) for name, ch_type in zip(source.column_names, source.column_types)]
+                yield from batched((row for block in stream for row in block), chunk_size)
+        except Exception as err:
+            self.logger.error(f"Failed to stream query results: {err}")
+            raise RuntimeError(f"Failed to stream query results: {err}") from err
+
+    def close(self) -> None:
+        """Close the connection to the Clickhouse database."""
+        if self.client:
+            self.client.close()
+            self.logger.info("Disconnected from Clickhouse database.")
+
+    def __enter__(self) -> "ArrowClickhouseClient":
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,10 +1,33 @@
 """Clickhouse table management module."""
 
 import logging
-from typing import Any, Dict, List, Optional
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from clickhouserag.clickhouse.base import ClickhouseTable
-from clickhouserag.clickhouse.clients import ClickhouseConnectClient
+from clickhouserag.clickhouse.clients import DEFAULT_BLOCK_SIZE, ClickhouseConnectClient
+from clickhouserag.utils import batched
+
+INSERT_CHUNK_SIZE = 100_000
+
+_IDENTIFIER = r"(`[^`]+`|[A-Za-z_][A-Za-z0-9_]*)"
+_TABLE_NAME = re.compile(rf"^{_IDENTIFIER}(\.{_IDENTIFIER})?$")
+
+
+@lru_cache(maxsize=256)
+def _update_query(table_name: str, value_keys: Tuple[str, ...], condition_keys: Tuple[str, ...]) -> str:
+    """Build the ALTER TABLE ... UPDATE query for the given value and condition keys."""
+    set_clause = ", ".join(f"{key} = %({key})s" for key in value_keys)
+    condition_clause = " AND ".join(f"{key} = %({key})s" for key in condition_keys)
+    return f"ALTER TABLE {table_name} UPDATE {set_clause} WHERE {condition_clause}"
+
+
+@lru_cache(maxsize=256)
+def _delete_query(table_name: str, condition_keys: Tuple[str, ...]) -> str:
+    """Build the DELETE query for the given condition keys."""
+    condition_clause = " AND ".join(f"{key} = %(cond_{key})s" for key in condition_keys)
+    return f"DELETE FROM {table_name} WHERE {condition_clause}"
 
 
 class ClickhouseTableManager(ClickhouseTable):
@@ -13,61 +36,137 @@ class ClickhouseTableManager(ClickhouseTable):
     def __init__(self, client: ClickhouseConnectClient, table_name: str) -> None:
         """Initialize ClickhouseTableManager.
 
+        Table names cannot be bound as query parameters, so the name is
+        validated once and the fixed queries are built here. Sending the
+        same query text on every call also lets Clickhouse's ``use_query_cache``
+        setting serve repeated reads, at the cost of results up to the cache TTL old.
+
         Args:
         ----
             client (ClickhouseConnectClient): The Clickhouse client.
-            table_name (str): The name of the table.
+            table_name (str): The name of the table, optionally qualified with the database.
+
+        Raises:
+        ------
+            ValueError: If the table name is not a valid Clickhouse identifier.
         """
+        match = _TABLE_NAME.match(table_name)
+        if not match:
+            raise ValueError(f"Invalid table name: {table_name!r}")
         super().__init__(client, table_name)
         self.logger = logging.getLogger(__name__)
+        self._insert_query = f"INSERT INTO {table_name} VALUES"
+        self._select_all_query = f"SELECT * FROM {table_name}"
+        self._truncate_query = f"TRUNCATE TABLE {table_name}"
+        self._exists_query = f"EXISTS TABLE {table_name}"
+        database, table = (match.group(1), match.group(3)) if match.group(3) else (None, match.group(1))
+        self._column_names_query = (
+            f"SELECT name FROM system.columns WHERE database = {'%(database)s' if database else 'currentDatabase()'} "
+            "AND table = %(table)s ORDER BY position"
+        )
+        self._index_names_query = (
+            f"SELECT name FROM system.data_skipping_indices WHERE database = {'%(database)s' if database else 'currentDatabase()'} "
+            "AND table = %(table)s"
+        )
+        self._column_names_params = {"table": table.strip("`")}
+        if database:
+            self._column_names_params["database"] = database.strip("`")
+
+    def insert(self, values: Iterable[Dict[str, Any]], chunk_size: int = INSERT_CHUNK_SIZE) -> None:
+        """Insert values into the table.
 
-    def insert(self, values: List[Dict[str, Any]]) -> None:
-        """Insert values into the table."""
-        query = f"INSERT INTO {self.table_name} VALUES"
-        self._execute_query(query, values, "insert")
+        Values are sent in chunks of ``chunk_size`` rows, so a generator is
+        never materialised and only one chunk is serialised at a time.
+        """
+        for chunk in batched(values, chunk_size):
+            self._execute_query(self._insert_query, chunk, "insert")
+
+    def insert_columnar(self, columns: Dict[str, List[Any]]) -> None:
+        """Insert column-oriented values into the table."""
+        try:
+            self.client.insert_columnar(self.table_name, columns)
+            self.logger.info("Insert columnar operation successful on %s", self.table_name)
+        except Exception as err:
+            self.logger.error(f"Failed to insert columnar in {self.table_name}: {err}")
+            raise RuntimeError(f"Failed to insert columnar in {self.table_name}") from err
 
     def update(self, values: Dict[str, Any], conditions: Dict[str, Any]) -> None:
         """Update values in the table based on conditions."""
-        set_clause = ", ".join([f"{key} = %({key})s" for key in values.keys()])
-        condition_clause = " AND ".join([f"{key} = %({key})s" for key in conditions.keys()])
-        query = f"ALTER TABLE {self.table_name} UPDATE {set_clause} WHERE {condition_clause}"
+        query = _update_query(self.table_name, tuple(sorted(values)), tuple(sorted(conditions)))
         self._execute_query(query, {**values, **conditions}, "update")
 
     def delete(self, conditions: Dict[str, Any]) -> None:
         """Delete values from the table based on conditions."""
-        condition_clause = " AND ".join([f"{key} = %(cond_{key})s" for key in conditions.keys()])
-        query = f"DELETE FROM {self.table_name} WHERE {condition_clause}"
+        query = _delete_query(self.table_name, tuple(sorted(conditions)))
         params = {f"cond_{key}": value for key, value in conditions.items()}
         self._execute_query(query, params, "delete")
 
-    def search(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def search(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[NamedTuple]:
         """Search the table based on a query."""
         return self._fetch_results(query, params, "search")
 
-    def fetch_all(self, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def fetch_all(self, params: Optional[Dict[str, Any]] = None) -> List[NamedTuple]:
         """Fetch all values from the table."""
-        query = f"SELECT * FROM {self.table_name}"
-        return self._fetch_results(query, params, "fetch all")
+        return self._fetch_results(self._select_all_query, params, "fetch all")
+
+    def fetch_iter(self, chunk_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[List[Tuple[str, str]], Iterator[List[Tuple]]]:
+        """Stream all values from the table in chunks of rows."""
+        try:
+            columns, chunks = self.client.execute_iter(self._select_all_query, chunk_size=chunk_size)
+            self.logger.info("Fetch iter query executed on %s", self.table_name)
+            return columns, chunks
+        except Exception as err:
+            self.logger.error(f"Failed to execute fetch iter query on {self.table_name}: {err}")
+            raise RuntimeError(f"Failed to execute fetch iter query on {self.table_name}") from err
 
     def reset_table(self) -> None:
         """Reset the table."""
-        query = f"TRUNCATE TABLE {self.table_name}"
-        self._execute_query(query, None, "truncate")
+        self._execute_query(self._truncate_query, None, "truncate")
+
+    def exists(self) -> bool:
+        """Check whether the table exists."""
+        try:
+            result = self.client.execute_query(self._exists_query)
+            return result[0][0] == 1
+        except Exception as err:
+            self.logger.error(f"Failed to check if {self.table_name} exists: {err}")
+            raise RuntimeError(f"Failed to check if {self.table_name} exists") from err
+
+    def column_names(self) -> List[str]:
+        """Return the names of the table columns, or an empty list if the table does not exist.
+
+        Answers both whether the table exists and which columns it has in
+        one round-trip, without failing on a missing table like ``DESCRIBE``.
+        """
+        try:
+            return [row[0] for row in self.client.execute_query(self._column_names_query, self._column_names_params)]
+        except Exception as err:
+            self.logger.error(f"Failed to describe {self.table_name}: {err}")
+            raise RuntimeError(f"Failed to describe {self.table_name}") from err
+
+    def index_names(self) -> List[str]:
+        """Return the names of the data skipping indexes of the table."""
+        try:
+            return [row[0] for row in self.client.execute_query(self._index_names_query, self._column_names_params)]
+        except Exception as err:
+            self.logger.error(f"Failed to list the indexes of {self.table_name}: {err}")
+            raise RuntimeError(f"Failed to list the indexes of {self.table_name}") from err
 
     def _execute_query(self, query: str, params: Optional[Dict[str, Any]], operation: str) -> None:
         """Execute a query in the Clickhouse database with error handling."""
         try:
             self.client.execute_query(query, params)
-            self.logger.info(f"{operation.capitalize()} operation successful on {self.table_name}")
+            # Lazy %-formatting, these run on every row-level call and INFO is usually disabled.
+            self.logger.info("%s operation successful on %s", operation.capitalize(), self.table_name)
         except Exception as err:
             self.logger.error(f"Failed to {operation} in {self.table_name}: {err}")
             raise RuntimeError(f"Failed to {operation} in {self.table_name}") from err
 
-    def _fetch_results(self, query: str, params: Optional[Dict[str, Any]], operation: str) -> List[Dict[str, Any]]:
+    def _fetch_results(self, query: str, params: Optional[Dict[str, Any]], operation: str) -> List[NamedTuple]:
         """Fetch results from the Clickhouse database with error handling."""
         try:
             results = self.client.fetch_all(query, params)
-            self.logger.info(f"{operation.capitalize()} query executed on {self.table_name}")
+            self.logger.info("%s query executed on %s", operation.capitalize(), self.table_name)
             return results
         except Exception as err:
             self.logger.error(f"Failed to execute {operation} query on {self.table_name}: {err}")
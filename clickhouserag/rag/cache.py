@@ -0,0 +1,150 @@
+"""Query result and vector caches for RAG searches."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class QueryCache:
+    """Thread-safe LRU cache with a time-to-live for query results.
+
+    Cached values are returned as stored, callers should treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0) -> None:
+        """Initialize QueryCache.
+
+        Args:
+        ----
+            maxsize (int): The maximum number of cached results.
+            ttl (Optional[float]): The number of seconds a result stays valid, None to keep it until evicted.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for the key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached values, e.g. after the underlying table changed."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache hit and miss counters and the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class VectorCache:
+    """Thread-safe in-memory copy of a table's vectors for client-side ranking.
+
+    The vectors are loaded on first use into one contiguous ``(N, D)``
+    float32 matrix of L2-normalized rows, so ranking a query is a single
+    matrix-vector product and a partial sort. All vectors must have the
+    same length. The cache holds ``N * D * 4`` bytes and is rebuilt after
+    ``clear``.
+
+    With a ``path``, the matrix is saved as ``.npy`` after loading, with the
+    ids next to it, and later processes memory-map it instead of fetching
+    the vectors again. Ids that are not numbers or strings (e.g. UUIDs) are
+    kept as strings, so they are saved without pickling. Writes through a manager remove the files; writes
+    from elsewhere are not seen until they are removed.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize VectorCache.
+
+        Args:
+        ----
+            path (Optional[str]): The ``.npy`` file to persist the normalized vectors to, None to keep them in memory only.
+        """
+        self.path = path
+        self._ids_path = f"{os.path.splitext(path)[0]}.ids.npy" if path else None
+        self._ids: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def search(
+        self, query_vector: np.ndarray, top_k: Optional[int], load: Callable[[], Tuple[Sequence[Any], Sequence[Any]]]
+    ) -> Tuple[List[Any], List[float]]:
+        """Rank the cached vectors by cosine similarity to a normalized query vector.
+
+        Args:
+        ----
+            query_vector (np.ndarray): The L2-normalized query vector.
+            top_k (Optional[int]): The number of results, None for all rows.
+            load (Callable[[], Tuple[Sequence[Any], Sequence[Any]]]): Returns the ids and vectors of the table on a miss.
+
+        Returns:
+        -------
+            Tuple[List[Any], List[float]]: The ids of the closest rows and their similarities, best first.
+        """
+        ids, matrix = self._get(load)
+        if not len(ids):
+            return [], []
+        scores = matrix @ query_vector
+        if top_k and top_k < len(scores):
+            order = np.argpartition(-scores, top_k - 1)[:top_k]
+            order = order[np.argsort(-scores[order])]
+        else:
+            order = np.argsort(-scores)
+        return ids[order].tolist(), scores[order].tolist()
+
+    def clear(self) -> None:
+        """Drop the cached vectors, e.g. after the underlying table changed."""
+        with self._lock:
+            self._ids = self._matrix = None
+            for path in (self.path, self._ids_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    def _get(self, load: Callable[[], Tuple[Sequence[Any], Sequence[Any]]]) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._matrix is None and self.path and os.path.exists(self.path) and os.path.exists(self._ids_path):
+                self._ids, self._matrix = np.load(self._ids_path), np.load(self.path, mmap_mode="r")
+            if self._matrix is None:
+                ids, vectors = load()
+                matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                np.divide(matrix, norms, out=matrix, where=norms != 0)
+                ids = np.array(ids)
+                if ids.dtype == object:
+                    ids = ids.astype(str)
+                self._ids, self._matrix = ids, matrix
+                if self.path and len(ids):
+                    np.save(self._ids_path, ids, allow_pickle=False)
+                    np.save(self.path, matrix, allow_pickle=False)
+            return self._ids, self._matrix
+
+    def __len__(self) -> int:
+        return 0 if self._ids is None else len(self._ids)
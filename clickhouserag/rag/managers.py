@@ -4,7 +4,9 @@ from typing import Dict, Optional
 
 from clickhouserag.clickhouse.clients import ClickhouseClient
 from clickhouserag.rag.base import RAGBase
+from clickhouserag.rag.cache import QueryCache, VectorCache
 from clickhouserag.rag.mixins import (
+    AsyncMixin,
     BackupMixin,
     DataOperationsMixin,
     TableManagerMixin,
@@ -12,11 +14,37 @@ from clickhouserag.rag.mixins import (
 )
 
 
-class RAGManager(TableManagerMixin, DataOperationsMixin, BackupMixin, VectorizerMixin, RAGBase):
+class RAGManager(TableManagerMixin, DataOperationsMixin, BackupMixin, VectorizerMixin, AsyncMixin, RAGBase):
     """Manager class for RAG operations in Clickhouse."""
 
-    def __init__(self, client: ClickhouseClient, table_name: str, table_schema: Optional[Dict[str, str]] = None, engine: str = "MergeTree", order_by: str = "id") -> None:
-        TableManagerMixin.__init__(self, client, table_name, table_schema, engine, order_by)
-        BackupMixin.__init__(self, client, self.table_manager)
+    def __init__(
+        self,
+        client: ClickhouseClient,
+        table_name: str,
+        table_schema: Optional[Dict[str, str]] = None,
+        engine: str = "MergeTree",
+        order_by: str = "id",
+        quantize_vectors: bool = False,
+        query_cache: Optional[QueryCache] = None,
+        max_workers: Optional[int] = None,
+        vector_index_dimensions: Optional[int] = None,
+        binary_vectors: bool = False,
+        vector_cache: Optional[VectorCache] = None,
+    ) -> None:
+        TableManagerMixin.__init__(
+            self,
+            client,
+            table_name,
+            table_schema,
+            engine,
+            order_by,
+            quantize_vectors,
+            query_cache,
+            vector_index_dimensions,
+            binary_vectors,
+            vector_cache,
+        )
+        BackupMixin.__init__(self, client, self.table_manager, quantize_vectors, binary_vectors, vector_index_dimensions)
         VectorizerMixin.__init__(self)
+        AsyncMixin.__init__(self, max_workers)
         RAGBase.__init__(self)
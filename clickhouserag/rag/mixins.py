@@ -1,49 +1,213 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import repeat
+from operator import contains, itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 
 from clickhouserag.backup.managers import BackupManager
-from clickhouserag.clickhouse.clients import ClickhouseClient
+from clickhouserag.clickhouse.clients import ArrowClickhouseClient, ClickhouseClient
 from clickhouserag.clickhouse.managers import ClickhouseTableManager
+from clickhouserag.rag.cache import QueryCache, VectorCache
+from clickhouserag.rag.schema import (
+    create_table_query,
+    derived_columns,
+    has_deleted_flag,
+    insert_columns,
+    is_upsert_engine,
+    is_versioned_engine,
+    vector_index,
+)
+from clickhouserag.utils import batched, prefetch, records_to_columns
+from clickhouserag.utils.similarity import (
+    binary_quantize,
+    quantize_int8,
+    vector_literal,
+)
 from clickhouserag.vectorizers.base import VectorizerBase
 from clickhouserag.vectorizers.managers import VectorizerManager
 
+BULK_INSERT_BATCH_SIZE = 50_000
+# Vectorized batches kept ready ahead of the insert loop by pipelined bulk inserts.
+PIPELINE_DEPTH = 2
+# Candidates kept per requested result by the binary prefilter before exact reranking.
+PREFILTER_CANDIDATES_PER_RESULT = 10
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=256)
+def _rows_by_id_query(read_table: str, columns: Tuple[str, ...], filtered: bool = True) -> str:
+    """Build the query fetching the given columns of a set of ids, or of every row, keyed by ``id`` first."""
+    query = f"SELECT id, {', '.join(columns)} FROM {read_table}"
+    return f"{query} WHERE id IN %(ids)s" if filtered else query
+
+
+@lru_cache(maxsize=256)
+def _similarity_query(
+    read_table: str, columns: Tuple[str, ...], quantized: bool, limited: bool, indexed: bool = False, prefiltered: bool = False
+) -> str:
+    """Build the cosine similarity query that follows its ``WITH`` clause.
+
+    The ``WITH`` clause defines ``query_vector``, plus ``query_bits`` for prefiltered queries.
+    """
+    if indexed:
+        # ORDER BY <distance function> LIMIT is the shape the vector_similarity index serves.
+        return (
+            f" SELECT {', '.join(columns)}, 1 - cosineDistance(vector, query_vector) AS cosine_distance "
+            f"FROM {read_table} "
+            "ORDER BY cosineDistance(vector, query_vector) LIMIT %(top_k)s"
+        )
+    if quantized:
+        vector_column = "vector_q"
+        # The lambda widens to Int32 so the sum of Int8 products cannot overflow.
+        dot_product = "arraySum((x, y) -> toInt32(x) * y, vector_q, query_vector) * vector_scale * %(query_scale)s"
+    else:
+        vector_column = "vector"
+        # Built-in SIMD kernel rather than a per-element lambda.
+        dot_product = "dotProduct(vector, query_vector)"
+    # Only the candidates closest in Hamming distance over the sign bits are scored exactly.
+    prefilter = (
+        f"AND id IN (SELECT id FROM {read_table} "
+        "ORDER BY arraySum((x, y) -> bitCount(bitXor(x, y)), vector_bits, query_bits) LIMIT %(candidates)s) "
+        if prefiltered
+        else ""
+    )
+    query = (
+        f" SELECT {', '.join(columns)}, "
+        f"vector_norm != 0 ? {dot_product} / vector_norm : 0 AS cosine_distance "
+        f"FROM {read_table} "
+        f"WHERE length(query_vector) == length({vector_column}) {prefilter}"
+        "ORDER BY cosine_distance DESC"
+    )
+    return f"{query} LIMIT %(top_k)s" if limited else query
+
 
 class TableManagerMixin:
-    def __init__(self, client: ClickhouseClient, table_name: str, table_schema: Optional[Dict[str, str]], engine: str, order_by: str) -> None:
+    def __init__(
+        self,
+        client: ClickhouseClient,
+        table_name: str,
+        table_schema: Optional[Dict[str, str]],
+        engine: str,
+        order_by: str,
+        quantize_vectors: bool = False,
+        query_cache: Optional[QueryCache] = None,
+        vector_index_dimensions: Optional[int] = None,
+        binary_vectors: bool = False,
+        vector_cache: Optional[VectorCache] = None,
+    ) -> None:
         self.client = client
         self.table_manager = ClickhouseTableManager(client, table_name)
         self.table_name = table_name
         self.table_schema = table_schema
         self.engine = engine
         self.order_by = order_by
+        self.quantize_vectors = quantize_vectors
+        self.vector_index_dimensions = vector_index_dimensions
+        self.binary_vectors = binary_vectors
+        self.query_cache = query_cache
+        self.vector_cache = vector_cache
+        # ReplacingMergeTree tables are updated by re-inserting rows and read with FINAL to see only the latest ones.
+        self.upserts = is_upsert_engine(engine)
+        self.versioned = is_versioned_engine(engine)
+        self.soft_deletes = has_deleted_flag(engine)
+        self._read_table = f"{table_name} FINAL" if self.upserts else table_name
+        # Built once, point lookups by id are the hottest read path.
+        self._columns = list(table_schema) if table_schema else None
+        self._insert_columns = insert_columns(table_schema, engine) if table_schema else None
+        self._get_data_query = f"SELECT {', '.join(self._columns or ['*'])} FROM {self._read_table} WHERE id = %(data_id)s"
+        self._get_data_many_query = f"SELECT {', '.join(self._columns or ['*'])} FROM {self._read_table} WHERE id IN %(data_ids)s"
+        self._table_columns: Optional[List[str]] = None
+        self._vectors_query = f"SELECT id, vector FROM {self._read_table}"
         self.logger = logging.getLogger(__name__)
 
         if table_schema:
             self._initialize_table(table_schema, engine, order_by)
 
     def _initialize_table(self, table_schema: Dict[str, str], engine: str, order_by: str) -> None:
-        if not self._check_table_exists():
+        """Create the table, or add the derived columns and vector index an existing one lacks.
+
+        One ``system.columns`` query tells both whether the table exists and
+        which columns it has, so an up-to-date table costs a single round-trip
+        and a new one two, the CREATE included. With ``vector_index_dimensions``
+        existing tables cost one more query to look the index up. No DDL runs
+        unless something is missing.
+        """
+        existing = set(self._existing_columns())
+        if not existing:
+            # IF NOT EXISTS keeps constructors racing on a new table from failing.
             self._create_table(table_schema, engine, order_by)
-        else:
-            self.logger.info(f"Table '{self.table_name}' already exists.")
+            return
+        self.logger.info(f"Table '{self.table_name}' already exists.")
+        # Tables created without the derived columns get them added; old parts compute them on read.
+        missing = [
+            column
+            for column in derived_columns(table_schema, self.quantize_vectors, engine, self.binary_vectors)
+            if column.split(" ", 1)[0] not in existing
+        ]
+        for column in missing:
+            self.client.execute_query(f"ALTER TABLE {self.table_name} ADD COLUMN IF NOT EXISTS {column}")
+        if missing:
+            self._table_columns = None
+        # Only parts written after this are indexed until MATERIALIZE INDEX is run.
+        if self.vector_index_dimensions and "vector" in table_schema and "vector_index" not in self.table_manager.index_names():
+            self.client.execute_query(f"ALTER TABLE {self.table_name} ADD INDEX IF NOT EXISTS {vector_index(self.vector_index_dimensions)}")
 
     def _create_table(self, table_schema: Dict[str, str], engine: str, order_by: str) -> None:
-        fields = ", ".join([f"{name} {dtype}" for name, dtype in table_schema.items()])
-        query = f"CREATE TABLE {self.table_name} ({fields}) ENGINE = {engine} ORDER BY {order_by}"
+        query = create_table_query(
+            self.table_name, table_schema, engine, order_by, self.quantize_vectors, self.vector_index_dimensions, self.binary_vectors
+        )
         self.client.execute_query(query)
-        self.logger.info(f"Table '{self.table_name}' created with schema: {table_schema}, engine: {engine}, order by: {order_by}")
+        self._table_columns = None
+        self.logger.info(f"Table '{self.table_name}' ensured with schema: {table_schema}, engine: {engine}, order by: {order_by}")
 
     def _check_table_exists(self) -> bool:
-        query = f"EXISTS TABLE {self.table_name}"
-        result = self.client.execute_query(query)
-        return result[0][0] == 1
+        return bool(self._existing_columns())
+
+    def _existing_columns(self) -> List[str]:
+        """Return the columns of the table, looked up once and reused until the table changes."""
+        if self._table_columns is None:
+            self._table_columns = self.table_manager.column_names()
+        return self._table_columns
 
     def reset_database(self) -> None:
         self.table_manager.reset_table()
+        self._invalidate_cache()
         self.logger.info("RAG table reset")
 
+    def _cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for the key, computing and caching it on a miss."""
+        if self.query_cache is None:
+            return compute()
+        result = self.query_cache.get(key)
+        if result is None:
+            result = compute()
+            self.query_cache.put(key, result)
+        return result
+
+    def _invalidate_cache(self) -> None:
+        if self.query_cache is not None:
+            self.query_cache.clear()
+        if self.vector_cache is not None:
+            self.vector_cache.clear()
+
 
 class DataOperationsMixin:
     def __init__(self):
@@ -53,95 +217,316 @@ class DataOperationsMixin:
         if vectorizer_name:
             data["vector"] = self.vectorize(data, vectorizer_name)
         self.validate_data(data)
+        if self.versioned:
+            data.setdefault("version", time.time_ns())
+        if self.soft_deletes:
+            # Row inserts send every non-materialized column, DEFAULT ones included.
+            data.setdefault("is_deleted", 0)
         self.table_manager.insert([data])
-        self.logger.info(f"Data added with id {data.get('id')}")
-
-    def add_bulk_data(self, data_list: List[Dict[str, Any]], vectorizer_name: Optional[str] = None, vectorizer: VectorizerBase = None) -> None:
+        self._invalidate_cache()
+        self.logger.info("Data added with id %s", data.get("id"))
+
+    def add_bulk_data(
+        self,
+        data_list: List[Dict[str, Any]],
+        vectorizer_name: Optional[str] = None,
+        vectorizer: VectorizerBase = None,
+        batch_size: int = BULK_INSERT_BATCH_SIZE,
+        pipeline: bool = False,
+    ) -> None:
+        """Vectorize the titles of the records and insert them in batches.
+
+        With ``pipeline``, each batch is vectorized and validated on a
+        background thread while the previous one is being inserted, so model
+        inference overlaps the network writes. Batches before an invalid one
+        are then already inserted.
+        """
         if vectorizer_name and vectorizer:
             raise ValueError("Only one of vectorizer_name and vectorizer should be provided.")
         if not (vectorizer_name or vectorizer):
             raise ValueError("Either vectorizer_name or vectorizer should be provided.")
 
-        if vectorizer_name:
-            for data in data_list:
-                data["vector"] = self.vectorize(data, vectorizer_name)
-        elif vectorizer:
-            vectors = vectorizer.bulk_vectorize([data["title"] for data in data_list])
-            for data, vector in zip(data_list, vectors):
-                data["vector"] = vector
-
-        for data in data_list:
-            self.validate_data(data)
+        vectorizer = vectorizer or self._resolve_vectorizer(vectorizer_name)
+        if pipeline:
+            batches = prefetch(map(partial(self._vectorize_batch, vectorizer), batched(data_list, batch_size)), PIPELINE_DEPTH)
+        else:
+            batches = batched(self._vectorize_batch(vectorizer, data_list), batch_size)
+
+        version = time.time_ns()
+        for batch in batches:
+            self._insert_batch(batch, version)
+        self._invalidate_cache()
+        self.logger.info("Bulk data added with %d records", len(data_list))
+
+    def _insert_batch(self, batch: List[Dict[str, Any]], version: int) -> None:
+        """Insert validated records column by column, with the given version on versioned tables."""
+        columns = records_to_columns(batch, self._insert_columns or self._existing_columns())
+        if self.versioned and "version" not in columns:
+            columns["version"] = [version] * len(batch)
+        # Native column-oriented blocks skip the server-side VALUES parser and per-row overhead.
+        # Over HTTP, batches go as Arrow tables so vectors are sent as one float32 buffer.
+        if isinstance(self.client, ArrowClickhouseClient):
+            from clickhouserag.backup.arrow import columns_to_arrow
+
+            self.client.insert_arrow(self.table_name, columns_to_arrow(columns))
+        else:
+            self.table_manager.insert_columnar(columns)
 
-        self.table_manager.insert(data_list)
-        self.logger.info(f"Bulk data added with {len(data_list)} records")
+    def _vectorize_batch(self, vectorizer: VectorizerBase, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach the vectors of the titles to the records and validate them."""
+        vectors = vectorizer.bulk_vectorize(list(map(itemgetter("title"), data_list)))
+        for data, vector in zip(data_list, vectors):
+            data["vector"] = vector
+        self.validate_bulk_data(data_list)
+        return data_list
 
     def delete_data(self, data_id: str) -> None:
-        self.table_manager.delete({"id": data_id})
-        self.logger.info(f"Data deleted with id {data_id}")
+        """Delete the row with the given id.
+
+        On ``ReplacingMergeTree(version, is_deleted)`` tables a tombstone
+        version is inserted instead of running a ``DELETE`` mutation; reads
+        with ``FINAL`` skip the row and merges eventually drop it.
+        """
+        if self.soft_deletes:
+            self.table_manager.insert_columnar({"id": [data_id], "version": [time.time_ns()], "is_deleted": [1]})
+        else:
+            self.table_manager.delete({"id": data_id})
+        self._invalidate_cache()
+        self.logger.info("Data deleted with id %s", data_id)
 
     def update_data(self, data_id: str, new_data: Dict[str, Any], vectorizer_name: Optional[str] = None) -> None:
+        """Update the row with the given id.
+
+        On MergeTree tables this runs an ``ALTER TABLE ... UPDATE`` mutation,
+        which rewrites whole parts in the background. On ReplacingMergeTree
+        tables the current row is merged with ``new_data`` and inserted as a
+        new version instead, which costs a single-row insert; background
+        merges drop the old version, and reads use ``FINAL`` until then.
+        """
         if vectorizer_name:
             new_data["vector"] = self.vectorize(new_data, vectorizer_name)
         self.validate_data(new_data)
-        self.table_manager.update(new_data, {"id": data_id})
-        self.logger.info(f"Data updated with id {data_id}")
+        if self.upserts:
+            current = self.get_data(data_id)
+            if current is None:
+                self.logger.warning(f"No data with id {data_id} to update")
+                return
+            row = {**current, **new_data, "id": data_id}
+            if self.versioned:
+                row["version"] = time.time_ns()
+            if self.soft_deletes:
+                row.setdefault("is_deleted", 0)
+            self.table_manager.insert([row])
+        else:
+            self.table_manager.update(new_data, {"id": data_id})
+        self._invalidate_cache()
+        self.logger.info("Data updated with id %s", data_id)
 
-    def search(self, query: str, similarity: bool = False, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    def search(
+        self, query: Union[str, np.ndarray], similarity: bool = False, top_k: Optional[int] = None
+    ) -> Union[List[NamedTuple], List[Dict[str, Any]]]:
         if similarity:
-            return self.similarity_search(query, top_k)
-        results = self.table_manager.search(query)
-        self.logger.info(f"Search executed with query '{query}', found {len(results)} results")
+            # With similarity the query is an embedding, matched against all the table columns.
+            return self.similarity_search(embedding=query, columns=self._columns or self._existing_columns(), top_k=top_k)
+        results = self._cached(("search", query), lambda: self.table_manager.search(query))
+        self.logger.info("Search executed with query '%s', found %d results", query, len(results))
         return results
 
-    def similarity_search(self, embedding: np.array, columns: List[str], top_k: Optional[int]) -> List[Dict[str, Any]]:
-        columns_str = ", ".join(columns)
-        query = f"""
-        WITH %(embedding)s as query_vector
-        SELECT {columns_str}
-        arraySum(x -> x * x, vector) * arraySum(x -> x * x, query_vector) != 0
-        ? arraySum((x, y) -> x * y, vector, query_vector) / sqrt(arraySum(x -> x * x, vector) * arraySum(x -> x * x, query_vector))
-        : 0 AS cosine_distance
-        FROM {self.table_name}
-        WHERE length(query_vector) == length(vector)
-        ORDER BY cosine_distance DESC
-        LIMIT %(top_k)s
+    def similarity_search(
+        self, embedding: np.array, columns: List[str], top_k: Optional[int], prefilter: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Return the rows closest to the embedding by cosine similarity.
+
+        The query vector is normalized once here and stored vectors are
+        divided by their precomputed ``vector_norm``, so the scan only
+        computes one dot product per row.
+
+        With ``quantize_vectors`` the dot product runs on the int8
+        ``vector_q`` column and the int8 query, reading a quarter of the
+        bytes of the Float32 vectors. Scores then carry a quantization
+        error of about 1%, which can swap near-tied neighbours; keep
+        quantization off where exact ranking matters.
+
+        With ``vector_index_dimensions`` and a ``top_k``, the search is
+        ordered by ``cosineDistance`` so the HNSW index can serve it. Results
+        are then approximate, and ``FINAL`` reads on ReplacingMergeTree tables
+        may still fall back to a full scan.
+
+        With ``prefilter`` on a table created with ``binary_vectors``, the
+        ``PREFILTER_CANDIDATES_PER_RESULT * top_k`` rows closest in Hamming
+        distance over the packed sign bits are selected first, reading 1/32
+        of the Float32 bytes, and only they are scored exactly. Neighbours
+        that the sign bits rank poorly can be missed.
+
+        With a ``vector_cache``, all vectors are loaded into memory once and
+        ranked locally with one matrix-vector product; only the rows of the
+        ``top_k`` ids are then read from Clickhouse, or the whole table
+        without a ``top_k``. Writes through the
+        manager reload the vectors on the next search.
+
+        With a ``query_cache``, results are cached per normalized query
+        vector, columns and ``top_k``.
         """
-        params = {"embedding": embedding.tolist(), "top_k": top_k}
-        result = self.client.execute_query(query, params=params, settings={"max_query_size": "10000000000000"})
-        self.logger.info(f"Similarity search executed with embedding, top {top_k} results found")
-        return [{"id": row[0], "title": row[1], "cosine_distance": row[2]} for row in result]
+        columns = [column for column in columns if column != "cosine_distance"]
+        query_vector = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm:
+            query_vector = query_vector / query_norm
+        if prefilter and not (self.binary_vectors and top_k):
+            raise ValueError("prefilter needs a top_k and a table created with binary_vectors=True")
+        cache_key = ("similarity", query_vector.tobytes(), tuple(columns), top_k, prefilter)
+        if self.vector_cache is not None and not prefilter:
+            return self._cached(cache_key, lambda: self._rank_cached_vectors(query_vector, columns, top_k))
+        return self._cached(cache_key, lambda: self._run_similarity_search(query_vector, columns, top_k, prefilter))
+
+    def _rank_cached_vectors(self, query_vector: np.ndarray, columns: List[str], top_k: Optional[int]) -> List[Dict[str, Any]]:
+        ids, scores = self.vector_cache.search(query_vector, top_k, self._load_vectors)
+        if not ids:
+            return []
+        # Without a top_k every row is returned, so they are read without an id list.
+        query = _rows_by_id_query(self._read_table, tuple(columns), filtered=top_k is not None)
+        params = {"ids": tuple(ids)} if top_k is not None else None
+        # The cache keeps UUIDs and other non-numeric ids as strings, so rows are matched by string form.
+        rows = {str(row[0]): row[1:] for row in self.client.execute_query(query, params=params)}
+        names = [*columns, "cosine_distance"]
+        # Rows deleted outside the manager since the vectors were loaded are skipped.
+        return [dict(zip(names, (*rows[str(row_id)], score))) for row_id, score in zip(ids, scores) if str(row_id) in rows]
+
+    def _load_vectors(self) -> Tuple[List[Any], List[Any]]:
+        rows = self.client.execute_query(self._vectors_query)
+        self.logger.info("Loaded %d vectors into the vector cache", len(rows))
+        ids, vectors = zip(*rows) if rows else ((), ())
+        return list(ids), list(vectors)
+
+    def _run_similarity_search(
+        self, query_vector: np.ndarray, columns: List[str], top_k: Optional[int], prefilter: bool = False
+    ) -> List[Dict[str, Any]]:
+        params = {"top_k": top_k}
+        indexed = bool(self.vector_index_dimensions and top_k) and not prefilter
+        quantized = self.quantize_vectors and not indexed
+        scan_vector = query_vector
+        if quantized:
+            scan_vector, params["query_scale"] = quantize_int8(query_vector)
+        with_clause = f"WITH {vector_literal(scan_vector)} AS query_vector"
+        if prefilter:
+            with_clause += f", {vector_literal(binary_quantize(query_vector))} AS query_bits"
+            params["candidates"] = top_k * PREFILTER_CANDIDATES_PER_RESULT
+        # Only the WITH literals change between calls, the rest of the SQL is built once per shape.
+        query = with_clause + _similarity_query(self._read_table, tuple(columns), quantized, bool(top_k), indexed, prefilter)
+        result = self.client.execute_query(query, params=params)
+        self.logger.info("Similarity search executed with embedding, top %s results found", top_k)
+        names = [*columns, "cosine_distance"]
+        return [dict(zip(names, row)) for row in result]
 
     def validate_data(self, data: Dict[str, Any]) -> None:
         if "id" not in data:
             raise ValueError("Data must contain an 'id' field")
 
+    def validate_bulk_data(self, data_list: List[Dict[str, Any]]) -> None:
+        """Validate many records at once.
+
+        The default ``id`` check runs as a single ``all(map(...))`` pass in C;
+        subclasses overriding ``validate_data`` get it called per record.
+        """
+        if type(self).validate_data is not DataOperationsMixin.validate_data:
+            for data in data_list:
+                self.validate_data(data)
+        elif not all(map(contains, data_list, repeat("id"))):
+            missing = next(index for index, data in enumerate(data_list) if "id" not in data)
+            raise ValueError(f"Data must contain an 'id' field, record {missing} has none")
+
     def get_data(self, data_id: str) -> Optional[Dict[str, Any]]:
-        query = f"SELECT * FROM {self.table_name} WHERE id = %(data_id)s"
-        result = self.client.fetch_one(query, params={"data_id": data_id})
-        if result:
-            return dict(zip(self.table_manager.columns, result))
-        return None
+        return self.client.fetch_one(self._get_data_query, params={"data_id": data_id})
+
+    def get_data_many(self, data_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Fetch the rows with the given ids in a single query.
+
+        Args:
+        ----
+            data_ids (Iterable[str]): The ids of the rows to fetch.
+
+        Returns:
+        -------
+            List[Dict[str, Any]]: The rows found, in no particular order; missing ids are skipped.
+        """
+        data_ids = tuple(data_ids)
+        if not data_ids:
+            return []
+        params = {"data_ids": data_ids}
+        if self._columns:
+            return [dict(zip(self._columns, row)) for row in self.client.execute_query(self._get_data_many_query, params=params)]
+        # Without a schema the query selects *, so the names come with the result.
+        columns, chunks = self.client.execute_iter(self._get_data_many_query, params=params)
+        names = [name for name, _ in columns]
+        return [dict(zip(names, row)) for chunk in chunks for row in chunk]
 
     def set_data(self, data: Dict[str, Any], vectorizer_name: Optional[str] = None) -> None:
+        """Insert the row, or replace the existing row with the same id.
+
+        On ReplacingMergeTree tables the row is always inserted as a new
+        version, without looking up the current one first, so ``data`` must
+        hold the whole row; use ``update_data`` to change only some fields.
+        """
         if "id" in data:
-            if self.get_data(data["id"]):
+            if self.upserts:
+                self.add_data(data, vectorizer_name)
+            elif self.get_data(data["id"]):
                 self.update_data(data["id"], data, vectorizer_name)
             else:
                 self.add_data(data, vectorizer_name)
         else:
             raise ValueError("Data must contain an 'id' field")
 
+    def set_bulk_data(self, data_list: List[Dict[str, Any]], vectorizer_name: Optional[str] = None) -> None:
+        """Insert or replace many rows, looking the existing ids up in one query.
 
-class BackupMixin:
-    def __init__(self, client: ClickhouseClient, table_manager: ClickhouseTableManager) -> None:
-        self.backup_manager = BackupManager(client, table_manager)
+        New rows are written with one bulk insert, through ``add_bulk_data``
+        when a vectorizer is given and as already vectorized rows otherwise;
+        rows whose id already exists are updated one by one, unless the table
+        uses the upsert engine, where every row is inserted as a new version.
+        """
+        self.validate_bulk_data(data_list)
+        if self.upserts:
+            self._add_rows(data_list, vectorizer_name)
+            return
+        # Ids come back typed (UUID, integers) while callers may pass strings, so compare string forms.
+        existing = {str(row["id"]) for row in self.get_data_many(map(itemgetter("id"), data_list))}
+        new_rows = [data for data in data_list if str(data["id"]) not in existing]
+        if new_rows:
+            self._add_rows(new_rows, vectorizer_name)
+        for data in data_list:
+            if str(data["id"]) in existing:
+                self.update_data(data["id"], data, vectorizer_name)
 
-    def backup_database(self, path: str) -> None:
-        self.backup_manager.backup_to_file(path)
+    def _add_rows(self, data_list: List[Dict[str, Any]], vectorizer_name: Optional[str]) -> None:
+        """Bulk insert validated rows, vectorizing them only when a vectorizer is given, like ``add_data``."""
+        if vectorizer_name:
+            self.add_bulk_data(data_list, vectorizer_name)
+            return
+        version = time.time_ns()
+        for batch in batched(data_list, BULK_INSERT_BATCH_SIZE):
+            self._insert_batch(batch, version)
+        self._invalidate_cache()
+        self.logger.info("Bulk data added with %d records", len(data_list))
+
+
+class BackupMixin:
+    def __init__(
+        self,
+        client: ClickhouseClient,
+        table_manager: ClickhouseTableManager,
+        quantize_vectors: bool = False,
+        binary_vectors: bool = False,
+        vector_index_dimensions: Optional[int] = None,
+    ) -> None:
+        self.backup_manager = BackupManager(client, table_manager, quantize_vectors, binary_vectors, vector_index_dimensions)
+
+    def backup_database(self, path: str, max_workers: int = 1) -> None:
+        self.backup_manager.backup_to_file(path, max_workers)
 
     def restore_database(self, path: str, table_schema: Optional[Dict[str, str]] = None, engine: str = "MergeTree", order_by: str = "id") -> None:
         self.backup_manager.restore_from_file(path, table_schema, engine, order_by)
+        self._invalidate_cache()
 
     def load_from_file(self, path: str, table_schema: Optional[Dict[str, str]] = None, engine: str = "MergeTree", order_by: str = "id") -> None:
         self.restore_database(path, table_schema, engine, order_by)
@@ -158,13 +543,63 @@ class VectorizerMixin:
         self.vectorizer_manager.add_vectorizer(name, vectorizer)
 
     def vectorize(self, data: Dict[str, Any], vectorizer_name: str) -> List[float]:
-        vectorizer = self.get_vectorizer(vectorizer_name)
-        if not vectorizer:
-            raise ValueError(f"Vectorizer '{vectorizer_name}' not found")
-        return vectorizer.vectorize(data["title"])
+        return self._resolve_vectorizer(vectorizer_name).vectorize(data["title"])
 
     def bulk_vectorize(self, data_list: List[Dict[str, Any]], vectorizer_name: str) -> List[List[float]]:
+        return self._resolve_vectorizer(vectorizer_name).bulk_vectorize(list(map(itemgetter("title"), data_list)))
+
+    def _resolve_vectorizer(self, vectorizer_name: str) -> VectorizerBase:
+        """Look the vectorizer up once per call, failing if it is not registered."""
         vectorizer = self.get_vectorizer(vectorizer_name)
-        if not vectorizer:
+        if vectorizer is None:
             raise ValueError(f"Vectorizer '{vectorizer_name}' not found")
-        return vectorizer.bulk_vectorize([data["title"] for data in data_list])
+        return vectorizer
+
+
+class AsyncMixin:
+    """Awaitable variants of the RAG operations, run on a shared thread pool.
+
+    Clickhouse I/O releases the GIL, so independent queries awaited together
+    (e.g. with ``asyncio.gather``) overlap their round-trips. The pool is
+    shared per manager, which keeps the number of concurrent queries bounded.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clickhouserag")
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def asimilarity_search(
+        self, embedding: np.array, columns: List[str], top_k: Optional[int], prefilter: bool = False
+    ) -> List[Dict[str, Any]]:
+        return await self._run(self.similarity_search, embedding, columns, top_k, prefilter)
+
+    async def asearch(self, query: str, similarity: bool = False, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.search, query, similarity, top_k)
+
+    async def aget_data(self, data_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.get_data, data_id)
+
+    async def aset_data(self, data: Dict[str, Any], vectorizer_name: Optional[str] = None) -> None:
+        await self._run(self.set_data, data, vectorizer_name)
+
+    async def aget_data_many(self, data_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        return await self._run(self.get_data_many, data_ids)
+
+    async def aadd_data(self, data: Dict[str, Any], vectorizer_name: Optional[str] = None) -> None:
+        await self._run(self.add_data, data, vectorizer_name)
+
+    async def aadd_bulk_data(self, data_list: List[Dict[str, Any]], **kwargs: Any) -> None:
+        await self._run(self.add_bulk_data, data_list, **kwargs)
+
+    async def aupdate_data(self, data_id: str, new_data: Dict[str, Any], vectorizer_name: Optional[str] = None) -> None:
+        await self._run(self.update_data, data_id, new_data, vectorizer_name)
+
+    async def adelete_data(self, data_id: str) -> None:
+        await self._run(self.delete_data, data_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool used by the async operations."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,174 @@
+"""Table schema helpers for RAG tables."""
+
+from typing import Dict, List, Optional
+
+# Computed by the server on insert, so similarity scans do not recompute the norm of every stored vector.
+VECTOR_NORM_COLUMN = "vector_norm Float32 MATERIALIZED L2Norm(vector)"
+# Symmetric int8 quantization: vector ~= vector_q * vector_scale, a quarter of the bytes of Float32 to scan.
+VECTOR_SCALE_COLUMN = "vector_scale Float32 MATERIALIZED arrayMax(x -> abs(x), vector) / 127"
+# Divides by the vector_scale column: a lambda capturing ``vector`` itself would copy it once per element.
+VECTOR_Q_COLUMN = "vector_q Array(Int8) MATERIALIZED arrayMap(x -> toInt8(round(x / greatest(vector_scale, 1e-30))), vector)"
+# Sign bits packed 64 per UInt64 (bit j of word i is vector[64 * i + j] > 0), 32x smaller than Float32 for a Hamming prefilter.
+# Built without lambdas capturing ``vector``, which ClickHouse would copy once per element.
+VECTOR_BITS_COLUMN = (
+    "vector_bits Array(UInt64) MATERIALIZED arrayMap(word -> arraySum(word), arraySplit((bit, i) -> i % 64 = 0, "
+    "arrayMap((x, i) -> bitShiftLeft(toUInt64(x > 0), i % 64), vector, range(length(vector))), range(length(vector))))"
+)
+# Row version for ReplacingMergeTree(version) tables, merges keep the row with the highest one.
+VERSION_COLUMN = "version UInt64 DEFAULT toUnixTimestamp64Nano(now64(9))"
+# Tombstone flag for ReplacingMergeTree(version, is_deleted) tables, FINAL hides rows whose latest version sets it.
+IS_DELETED_COLUMN = "is_deleted UInt8 DEFAULT 0"
+UPSERT_ENGINE = "ReplacingMergeTree(version, is_deleted)"
+# Wide parts keep every column in its own file from the first insert, so scans read only the columns they use.
+TABLE_SETTINGS = "min_bytes_for_wide_part = 0"
+# One index granule per part, as recommended for vector_similarity indexes.
+VECTOR_INDEX_GRANULARITY = 100_000_000
+
+
+def has_vector_norm(table_schema: Dict[str, str]) -> bool:
+    """Check whether the table gets a derived ``vector_norm`` column.
+
+    Args:
+    ----
+        table_schema (Dict[str, str]): The column names with their Clickhouse types.
+
+    Returns:
+    -------
+        bool: True if the schema has a ``vector`` column and does not define ``vector_norm`` itself.
+    """
+    return "vector" in table_schema and "vector_norm" not in table_schema
+
+
+def is_upsert_engine(engine: str) -> bool:
+    """Check whether rows of the engine are updated by inserting a new version of them."""
+    return engine.strip().startswith("ReplacingMergeTree")
+
+
+def is_versioned_engine(engine: str) -> bool:
+    """Check whether the engine deduplicates rows by the ``version`` column."""
+    return engine.replace(" ", "").startswith("ReplacingMergeTree(version")
+
+
+def has_deleted_flag(engine: str) -> bool:
+    """Check whether the engine removes rows flagged with ``is_deleted`` (Clickhouse 23.2+)."""
+    return is_versioned_engine(engine) and "is_deleted" in engine
+
+
+def vector_index(dimensions: int) -> str:
+    """Build the definition of the HNSW cosine index on the ``vector`` column.
+
+    ``vector_similarity`` indexes need Clickhouse 25.1+; before 25.8 the
+    ``allow_experimental_vector_similarity_index`` setting must be enabled
+    for the user creating the table.
+
+    Args:
+    ----
+        dimensions (int): The length of the stored vectors.
+
+    Returns:
+    -------
+        str: The index definition, without the leading ``INDEX`` keyword.
+    """
+    return f"vector_index vector TYPE vector_similarity('hnsw', 'cosineDistance', {dimensions}) GRANULARITY {VECTOR_INDEX_GRANULARITY}"
+
+
+def derived_columns(
+    table_schema: Dict[str, str], quantize_vectors: bool = False, engine: str = "MergeTree", binary_vectors: bool = False
+) -> List[str]:
+    """Return the definitions of the columns the RAG layer adds to the schema.
+
+    Args:
+    ----
+        table_schema (Dict[str, str]): The column names with their Clickhouse types.
+        quantize_vectors (bool): Whether to add the int8 quantized copy of the vector.
+        engine (str): The table engine, ``ReplacingMergeTree(version, is_deleted)`` adds
+            the version and deletion flag columns.
+        binary_vectors (bool): Whether to add the packed sign bits of the vector.
+
+    Returns:
+    -------
+        List[str]: The column definitions.
+    """
+    columns = []
+    if has_vector_norm(table_schema):
+        columns.append(VECTOR_NORM_COLUMN)
+        if quantize_vectors:
+            columns += [VECTOR_SCALE_COLUMN, VECTOR_Q_COLUMN]
+        if binary_vectors:
+            columns.append(VECTOR_BITS_COLUMN)
+    if is_versioned_engine(engine) and "version" not in table_schema:
+        columns.append(VERSION_COLUMN)
+    if has_deleted_flag(engine) and "is_deleted" not in table_schema:
+        columns.append(IS_DELETED_COLUMN)
+    return columns
+
+
+def table_fields(
+    table_schema: Dict[str, str],
+    quantize_vectors: bool = False,
+    engine: str = "MergeTree",
+    vector_index_dimensions: Optional[int] = None,
+    binary_vectors: bool = False,
+) -> str:
+    """Build the column definitions of a CREATE TABLE query, adding the derived RAG columns.
+
+    Args:
+    ----
+        table_schema (Dict[str, str]): The column names with their Clickhouse types.
+        quantize_vectors (bool): Whether to add the int8 quantized copy of the vector.
+        engine (str): The table engine.
+        vector_index_dimensions (Optional[int]): The vector length, adds an HNSW index on ``vector`` when set.
+        binary_vectors (bool): Whether to add the packed sign bits of the vector.
+
+    Returns:
+    -------
+        str: The comma-separated column and index definitions.
+    """
+    fields = [f"{name} {dtype}" for name, dtype in table_schema.items()] + derived_columns(table_schema, quantize_vectors, engine, binary_vectors)
+    if vector_index_dimensions and "vector" in table_schema:
+        fields.append(f"INDEX {vector_index(vector_index_dimensions)}")
+    return ", ".join(fields)
+
+
+def create_table_query(
+    table_name: str,
+    table_schema: Dict[str, str],
+    engine: str = "MergeTree",
+    order_by: str = "id",
+    quantize_vectors: bool = False,
+    vector_index_dimensions: Optional[int] = None,
+    binary_vectors: bool = False,
+) -> str:
+    """Build the CREATE TABLE IF NOT EXISTS query of a RAG table, shared by the manager and restores.
+
+    Args:
+    ----
+        table_name (str): The name of the table.
+        table_schema (Dict[str, str]): The column names with their Clickhouse types.
+        engine (str): The table engine.
+        order_by (str): The sorting key of the table.
+        quantize_vectors (bool): Whether to add the int8 quantized copy of the vector.
+        vector_index_dimensions (Optional[int]): The vector length, adds an HNSW index on ``vector`` when set.
+        binary_vectors (bool): Whether to add the packed sign bits of the vector.
+
+    Returns:
+    -------
+        str: The CREATE TABLE query.
+    """
+    fields = table_fields(table_schema, quantize_vectors, engine, vector_index_dimensions, binary_vectors)
+    return f"CREATE TABLE IF NOT EXISTS {table_name} ({fields}) ENGINE = {engine} ORDER BY {order_by} SETTINGS {TABLE_SETTINGS}"
+
+
+def insert_columns(table_schema: Dict[str, str], engine: str = "MergeTree") -> List[str]:
+    """Return the columns rows can set: the schema's, plus the version and deletion flag columns of the engine.
+
+    Args:
+    ----
+        table_schema (Dict[str, str]): The column names with their Clickhouse types.
+        engine (str): The table engine.
+
+    Returns:
+    -------
+        List[str]: The column names, materialized columns excluded.
+    """
+    return list(table_schema) + [column.split(" ", 1)[0] for column in derived_columns(table_schema, engine=engine) if " MATERIALIZED " not in column]
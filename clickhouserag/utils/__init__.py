@@ -1,14 +1,33 @@
 """Utilities package for ClickhouseRAG."""
 
-import importlib
+import importlib.util
 import json
 import os
-from typing import Any
+import queue
+import re
+import threading
+from itertools import islice
+from operator import itemgetter
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_FORMAT_ALIASES = {"xlsx": "excel"}
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER_CHARS = re.compile(r"[0-9.eE+-]*")
+JSON_READ_SIZE = 1 << 20
 
 
 def check_installed(*libraries: str) -> None:
     """Check if the required libraries are installed.
 
+    Only the import machinery is consulted, the libraries are not imported,
+    so gating a feature on e.g. ``pyarrow`` does not pay for loading it.
+
     Args:
     ----
         libraries (str): Libraries to check.
@@ -19,9 +38,12 @@ def check_installed(*libraries: str) -> None:
     """
     for lib in libraries:
         try:
-            importlib.import_module(lib)
-        except ImportError as e:
-            raise ImportError(f"Library '{lib}' is not installed. Please install it to use this feature.") from e
+            found = importlib.util.find_spec(lib) is not None
+        except ImportError:
+            # Raised for dotted names whose parent package is missing
+            found = False
+        if not found:
+            raise ImportError(f"Library '{lib}' is not installed. Please install it to use this feature.")
 
 def get_format_from_path(path: str) -> str:
     """Get the backup format from the file path.
@@ -38,16 +60,252 @@ def get_format_from_path(path: str) -> str:
     ------
         ValueError: If the file extension does not match a supported format.
     """
-    ext = os.path.splitext(path)[1].lower()
+    ext = os.path.splitext(path.rstrip("/"))[1].lower()
     if ext:
-        return ext.lstrip(".")
+        ext = ext.lstrip(".")
+        return _FORMAT_ALIASES.get(ext, ext)
     else:
         raise ValueError(f"Unsupported file extension: {ext}")
 
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items.
+
+    Args:
+    ----
+        iterable (Iterable[Any]): The items to split.
+        size (int): The maximum number of items per batch.
+
+    Yields:
+    ------
+        List[Any]: The next batch of items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def records_to_columns(records: List[Dict[str, Any]], columns: List[str]) -> Dict[str, Tuple[Any, ...]]:
+    """Transpose row dicts into the table columns they set.
+
+    Only the columns the records set are returned, in table order, so the
+    server fills in the defaults of the others. The transposition runs in C
+    through ``itemgetter`` and ``zip``, without a Python loop over the values.
+
+    Args:
+    ----
+        records (List[Dict[str, Any]]): The records, all with the same keys.
+        columns (List[str]): The names of the table columns.
+
+    Returns:
+    -------
+        Dict[str, Tuple[Any, ...]]: The values of each column, keyed by column name.
+
+    Raises:
+    ------
+        ValueError: If a record has a key that is not a table column, or lacks a key another record has.
+    """
+    if not records:
+        return {}
+    keys = set().union(*records)
+    unknown = keys.difference(columns)
+    if unknown:
+        raise ValueError(f"Records have keys that are not table columns: {sorted(unknown)}")
+    present = [column for column in columns if column in keys]
+    getter = itemgetter(*present)
+    try:
+        rows = map(getter, records) if len(present) > 1 else ((getter(record),) for record in records)
+        values = list(zip(*rows))
+    except KeyError as err:
+        missing = next(index for index, record in enumerate(records) if err.args[0] not in record)
+        raise ValueError(f"Record {missing} has no {err.args[0]!r} key, unlike other records") from None
+    return dict(zip(present, values))
+
+def _put_until_stopped(items: queue.Queue, item: Any, stop: threading.Event) -> None:
+    """Put an item in the queue, giving up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def _produce(iterable: Iterable[Any], items: queue.Queue, stop: threading.Event, done: object) -> None:
+    """Feed the items of the iterable to the queue, ending with ``done`` and the producer error if any."""
+    try:
+        for item in iterable:
+            if stop.is_set():
+                return
+            _put_until_stopped(items, (item, None), stop)
+        _put_until_stopped(items, (done, None), stop)
+    except BaseException as err:
+        _put_until_stopped(items, (done, err), stop)
+
+def prefetch(iterable: Iterable[Any], maxsize: int = 4) -> Iterator[Any]:
+    """Iterate in a background thread, keeping up to ``maxsize`` items ready.
+
+    This lets the producer (e.g. a Clickhouse result stream) fetch the next
+    items while the consumer is still busy with the current one. Errors raised
+    by the producer are re-raised in the consumer.
+
+    Args:
+    ----
+        iterable (Iterable[Any]): The items to produce.
+        maxsize (int): The maximum number of items buffered ahead of the consumer.
+
+    Yields:
+    ------
+        Any: The produced items, in order.
+    """
+    items: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    producer = threading.Thread(target=_produce, args=(iterable, items, stop, done), daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, err = items.get()
+            if item is done:
+                if err is not None:
+                    raise err
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
 def load_json(path: str) -> Any:
+    if orjson is not None:
+        with open(path, "rb") as file:
+            return orjson.loads(file.read())
     with open(path, "r") as file:
         return json.load(file)
 
 def save_json(data: Any, path: str) -> None:
+    if orjson is not None:
+        with open(path, "wb") as file:
+            file.write(orjson.dumps(data, option=_ORJSON_OPTIONS))
+        return
     with open(path, "w") as file:
         json.dump(data, file)
+
+class _JsonChunkReader:
+    """Decode JSON values from a text file read in ``JSON_READ_SIZE`` chunks."""
+
+    def __init__(self, file: IO[str]) -> None:
+        self.file = file
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.pos, self.eof = "", 0, False
+
+    def fill(self) -> None:
+        chunk = self.file.read(JSON_READ_SIZE)
+        self.eof = not chunk
+        self.buffer, self.pos = self.buffer[self.pos :] + chunk, 0
+
+    def next_token(self) -> str:
+        """Skip whitespace and return the next character, or ``""`` at the end of the file."""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos : self.pos + 1]
+            self.fill()
+
+    def decode(self) -> Any:
+        """Decode the next value, reading more chunks until it is complete."""
+        self.next_token()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # A number cut by the chunk boundary (e.g. "1.5e-") decodes as a shorter valid
+            # number, so a value running into the end of the buffer is decoded again with more input.
+            if self.eof or _JSON_NUMBER_CHARS.match(self.buffer, end).end() < len(self.buffer):
+                self.pos = end
+                return item
+            self.fill()
+
+def load_json_array(path: str) -> Iterator[Any]:
+    """Lazily read the items of a top-level JSON array.
+
+    The file is read in ``JSON_READ_SIZE`` chunks and decoded one item at a
+    time, so memory is bounded by the largest item rather than the file.
+
+    Args:
+    ----
+        path (str): The file path.
+
+    Yields:
+    ------
+        Any: The next array item.
+
+    Raises:
+    ------
+        ValueError: If the file does not hold a JSON array.
+    """
+    with open(path, "r") as file:
+        reader = _JsonChunkReader(file)
+        reader.fill()
+        if reader.next_token() != "[":
+            raise ValueError(f"Expected a JSON array in {path}")
+        reader.pos += 1
+        if reader.next_token() == "]":
+            return
+        while True:
+            yield reader.decode()
+            token = reader.next_token()
+            if token == "]":
+                return
+            if token != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array in {path}")
+            reader.pos += 1
+
+def save_json_array(rows: Iterable[Any], path: str) -> None:
+    """Write values as one JSON array, encoding and writing them one at a time.
+
+    Args:
+    ----
+        rows (Iterable[Any]): The array items, consumed lazily.
+        path (str): The file path.
+    """
+    dumps = (lambda row: orjson.dumps(row, option=_ORJSON_OPTIONS)) if orjson is not None else (lambda row: json.dumps(row).encode())
+    with open(path, "wb") as file:
+        separator = b"["
+        for row in rows:
+            file.write(separator)
+            file.write(dumps(row))
+            separator = b","
+        file.write(b"[]" if separator == b"[" else b"]")
+
+def load_ndjson(path: str) -> Iterator[Any]:
+    """Lazily read newline-delimited JSON, one value per line.
+
+    Args:
+    ----
+        path (str): The file path.
+
+    Yields:
+    ------
+        Any: The value decoded from the next non-empty line.
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, "rb") as file:
+        for line in file:
+            if line.strip():
+                yield loads(line)
+
+def save_ndjson(rows: Iterable[Any], path: str) -> None:
+    """Write values as newline-delimited JSON, one value per line.
+
+    Args:
+    ----
+        rows (Iterable[Any]): The values to write, consumed lazily.
+        path (str): The file path.
+    """
+    with open(path, "wb") as file:
+        for row in rows:
+            if orjson is not None:
+                file.write(orjson.dumps(row, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE))
+            else:
+                file.write(json.dumps(row).encode() + b"\n")
@@ -1,11 +1,83 @@
-from typing import List
+from typing import List, Tuple, Union
 
+import numpy as np
 
-def compute_cosine_similarity(vector1: List[float], vector2: List[float]) -> float:
-        """Compute the cosine similarity between two vectors."""
-        dot_product = sum(p * q for p, q in zip(vector1, vector2))
-        magnitude1 = sum(p ** 2 for p in vector1) ** 0.5
-        magnitude2 = sum(q ** 2 for q in vector2) ** 0.5
-        if magnitude1 * magnitude2 == 0:
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+# Element types simsimd.cosine handles natively, arrays of these are passed to it without conversion.
+_SIMSIMD_DTYPES = frozenset(map(np.dtype, (np.float64, np.float32, np.float16, np.int8)))
+
+
+def compute_cosine_similarity(vector1: Union[List[float], np.ndarray], vector2: Union[List[float], np.ndarray]) -> float:
+    """Compute the cosine similarity between two vectors.
+
+    The three dot products run in NumPy's BLAS kernels with a single square
+    root, and contiguous float32 ndarray inputs are used without copying.
+    With ``simsimd`` installed, the single-pass SIMD cosine kernel
+    (AVX2/AVX-512/NEON/SVE, picked at runtime) is used instead, and ndarrays
+    sharing a float64, float16 or int8 dtype are passed to it as they are.
+    """
+    if simsimd is not None and _same_simsimd_dtype(vector1, vector2):
+        v1, v2 = np.ascontiguousarray(vector1), np.ascontiguousarray(vector2)
+    else:
+        v1 = np.ascontiguousarray(vector1, dtype=np.float32)
+        v2 = np.ascontiguousarray(vector2, dtype=np.float32)
+    if v1.size != v2.size:
+        raise ValueError(f"Vectors have different lengths: {v1.size} and {v2.size}")
+    if simsimd is not None:
+        if not (v1.any() and v2.any()):
             return 0.0
-        return dot_product / (magnitude1 * magnitude2)
+        return 1.0 - float(simsimd.cosine(v1, v2))
+    denominator = np.sqrt(np.dot(v1, v1) * np.dot(v2, v2))
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(v1, v2) / denominator)
+
+
+def _same_simsimd_dtype(vector1: object, vector2: object) -> bool:
+    """Check whether both vectors are ndarrays of one dtype simsimd handles natively."""
+    return (
+        isinstance(vector1, np.ndarray)
+        and isinstance(vector2, np.ndarray)
+        and vector1.dtype == vector2.dtype
+        and vector1.dtype in _SIMSIMD_DTYPES
+    )
+
+
+def quantize_int8(vector: Union[List[float], np.ndarray]) -> Tuple[np.ndarray, float]:
+    """Quantize a vector to int8 with a single symmetric scale.
+
+    The vector is approximated by ``quantized * scale``, matching the
+    ``vector_q``/``vector_scale`` columns stored for quantized RAG tables.
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    max_abs = float(np.abs(vector).max()) if vector.size else 0.0
+    if max_abs == 0:
+        return np.zeros(vector.shape, dtype=np.int8), 0.0
+    return np.round(vector / max_abs * 127).astype(np.int8), max_abs / 127
+
+
+def binary_quantize(vector: Union[List[float], np.ndarray]) -> np.ndarray:
+    """Pack the sign bits of a vector into UInt64 words.
+
+    Bit ``j`` of word ``i`` is set when ``vector[64 * i + j] > 0``, matching
+    the ``vector_bits`` column stored for RAG tables with binary vectors.
+    """
+    bits = np.asarray(vector, dtype=np.float32) > 0
+    bits = np.pad(bits, (0, -bits.size % 64)).reshape(-1, 64).astype(np.uint64)
+    return (bits << np.arange(64, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+
+def vector_literal(vector: np.ndarray) -> str:
+    """Render a vector as a Clickhouse array literal.
+
+    Floats are written with 9 significant digits, which round-trips float32
+    exactly and is several times faster (and shorter) than escaping a list
+    of Python floats as a query parameter.
+    """
+    if vector.dtype.kind in "iu":
+        return "[" + ",".join(map(str, vector.tolist())) + "]"
+    return "[" + ",".join(map("{:.9g}".format, vector.tolist())) + "]"
@@ -12,7 +12,10 @@ class VectorizerBase(ABC):
         """Convert data into a vector representation."""
         pass
 
-    @abstractmethod
     def bulk_vectorize(self, data: Any) -> List[List[float]]:
-        """Convert multiple data into a vector representation."""
-        pass
+        """Convert multiple data into a vector representation.
+
+        The default implementation vectorizes items one by one; override it
+        to run the model on the whole batch in a single call.
+        """
+        return [self.vectorize(item) for item in data]
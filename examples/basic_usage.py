@@ -6,6 +6,7 @@ from transformers import AutoModel, AutoTokenizer
 
 from clickhouserag.clickhouse.clients import ClickhouseConnectClient
 from clickhouserag.rag.managers import RAGManager
+from clickhouserag.rag.schema import UPSERT_ENGINE
 from clickhouserag.vectorizers.base import VectorizerBase
 
 
@@ -21,7 +22,11 @@ class TransformersVectorizer(VectorizerBase):
 
         """
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = AutoModel.from_pretrained(model_name).to(self.device).eval()
+        if self.device == "cuda":
+            # Half precision doubles tensor core throughput, embeddings are stored as Float32 anyway
+            self.model = self.model.half()
 
     def vectorize(self, data: Any) -> List[float]:
         """Convert text data into a vector representation using a Transformers model.
@@ -38,13 +43,11 @@ class TransformersVectorizer(VectorizerBase):
         if not isinstance(data, str):
             raise ValueError("Data should be a string for text vectorization.")
 
-        inputs = self.tokenizer(
-            data, return_tensors="pt", truncation=True, padding=True
-        )
-        with torch.no_grad():
+        inputs = self._tokenize(data)
+        with torch.inference_mode():
             outputs = self.model(**inputs)
             # Use the mean pooling of the last hidden state as the vector
-            vector = outputs.last_hidden_state.mean(dim=1).squeeze().tolist()
+            vector = outputs.last_hidden_state.mean(dim=1).squeeze().float().cpu().tolist()
 
         return vector
 
@@ -60,18 +63,27 @@ class TransformersVectorizer(VectorizerBase):
             List[float]: The vector representation of the listed text data.
 
         """
-        if not isinstance(data, List[str]):
+        if not isinstance(data, list) or not all(isinstance(item, str) for item in data):
             raise ValueError("Data should be a list of a strings for text vectorization.")
 
+        # One tokenizer call and one forward pass for the whole list
+        inputs = self._tokenize(data)
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+            # Mean pooling over the real tokens only, padding would skew shorter texts
+            # Pooled in float32 so half precision sums cannot overflow
+            hidden = outputs.last_hidden_state.float()
+            mask = inputs["attention_mask"].unsqueeze(-1).float()
+            vectors = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+
+        return vectors.cpu().tolist()
+
+    def _tokenize(self, data: Any) -> dict:
+        """Tokenize the text data and move the tensors to the model device."""
         inputs = self.tokenizer(
             data, return_tensors="pt", truncation=True, padding=True
         )
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            # Use the mean pooling of the last hidden state as the vector
-            vector = outputs.last_hidden_state.mean(dim=1).squeeze().tolist()
-
-        return vector
+        return {key: value.to(self.device, non_blocking=True) for key, value in inputs.items()}
 
 
 def main():
@@ -91,11 +103,12 @@ def main():
     table_schema = {
         "id": "UInt32",
         "title": "String",
-        "vector": "Array(Float64)"
+        "vector": "Array(Float32)"
     }
 
-    # Создание экземпляра RAGManager с указанным движком и схемой таблицы
-    rag_manager = RAGManager(client, "rag_table", table_schema, engine="MergeTree", order_by="id")
+    # Создание экземпляра RAGManager с указанным движком и схемой таблицы.
+    # ReplacingMergeTree превращает обновления и удаления в вставки новых версий строк
+    rag_manager = RAGManager(client, "rag_table", table_schema, engine=UPSERT_ENGINE, order_by="id")
 
     # Создание и добавление векторизатора Transformers
     transformers_vectorizer = TransformersVectorizer(model_name="distilbert-base-uncased")
@@ -122,7 +135,7 @@ def main():
     rag_manager.update_data(1, updated_data, vectorizer_name="transformers")
 
     # Выполнение поиска по тексту
-    query = "SELECT * FROM rag_table WHERE title LIKE '%Sample%'"
+    query = "SELECT * FROM rag_table FINAL WHERE title LIKE '%Sample%'"
     search_results = rag_manager.search(query)
     print("Search results:", search_results)
 
@@ -140,7 +153,7 @@ def main():
 
     # Сброс и восстановление базы данных
     rag_manager.reset_database()
-    rag_manager.restore_database("backup.json", table_schema=table_schema, engine="MergeTree", order_by="id")
+    rag_manager.restore_database("backup.json", table_schema=table_schema, engine=UPSERT_ENGINE, order_by="id")
 
     # Закрытие подключения к базе данных
     client.close()
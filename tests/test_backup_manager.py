@@ -0,0 +1,274 @@
+import csv
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from clickhouserag.backup.managers import BackupManager
+from clickhouserag.clickhouse.clients import ArrowClickhouseClient
+from clickhouserag.clickhouse.managers import ClickhouseTableManager
+from clickhouserag.rag.schema import UPSERT_ENGINE
+from clickhouserag.utils import load_json_array
+
+
+def test_backup_to_parquet_streams_chunks(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String"), ("vector", "Array(Float32)")]
+    chunks = iter([[("1", "First", [0.1, 0.2])], [("2", "Second", [0.3, 0.4])]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    rag_manager.table_manager.fetch_all = MagicMock()
+    path = tmp_path / "backup.parquet"
+
+    rag_manager.backup_database(str(path))
+
+    rag_manager.table_manager.fetch_all.assert_not_called()
+    table = pq.read_table(path)
+    assert table.column_names == ["id", "title", "vector"]
+    assert table.column("id").to_pylist() == ["1", "2"]
+    assert table.schema.field("vector").type.value_type == pa.float32()
+    metadata = pq.ParquetFile(path).metadata.row_group(0)
+    assert metadata.column(0).compression == "ZSTD"
+    assert metadata.column(2).compression == "SNAPPY"
+
+
+def test_backup_to_csv_streams_chunks(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String")]
+    chunks = iter([[("1", "First")], [("2", "Second")]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    path = tmp_path / "backup.csv"
+
+    rag_manager.backup_database(str(path))
+
+    with open(path, newline="") as file:
+        assert list(csv.reader(file)) == [["id", "title"], ["1", "First"], ["2", "Second"]]
+
+
+def test_restore_from_csv_inserts_in_chunks(rag_manager, tmp_path):
+    path = tmp_path / "backup.csv"
+    path.write_text("id,title\n1,First\n2,Second\n")
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+
+    with patch("clickhouserag.backup.managers.CSV_CHUNK_SIZE", 1):
+        rag_manager.restore_database(str(path))
+
+    rag_manager.table_manager.reset_table.assert_called_once()
+    assert rag_manager.table_manager.insert_columnar.call_count == 2
+    rag_manager.table_manager.insert_columnar.assert_called_with({"id": [2], "title": ["Second"]})
+
+
+def test_restore_from_parquet_projects_schema_columns(rag_manager, tmp_path):
+    path = tmp_path / "backup.parquet"
+    pq.write_table(pa.table({"id": ["1", "2"], "title": ["First", "Second"], "extra": [1, 2]}), path)
+    rag_manager.client.execute_query.return_value = [(1,)]
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+
+    rag_manager.restore_database(str(path), table_schema={"id": "String", "title": "String"})
+
+    rag_manager.table_manager.insert_columnar.assert_called_once_with({"id": ["1", "2"], "title": ["First", "Second"]})
+
+
+def test_restore_from_parquet_keeps_upsert_engine_columns(rag_manager, tmp_path):
+    path = tmp_path / "backup.parquet"
+    pq.write_table(pa.table({"id": ["1", "2"], "title": ["First", "Second"], "version": [3, 4], "is_deleted": [0, 1]}), path)
+    rag_manager.client.execute_query.return_value = [(1,)]
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+
+    rag_manager.restore_database(str(path), table_schema={"id": "String", "title": "String"}, engine=UPSERT_ENGINE)
+
+    rag_manager.table_manager.insert_columnar.assert_called_once_with(
+        {"id": ["1", "2"], "title": ["First", "Second"], "version": [3, 4], "is_deleted": [0, 1]}
+    )
+
+
+def test_create_table_keeps_derived_vector_columns(clickhouse_client, table_manager):
+    backup_manager = BackupManager(clickhouse_client, table_manager, quantize_vectors=True, binary_vectors=True)
+    clickhouse_client.execute_query = MagicMock()
+
+    backup_manager._create_table({"id": "String", "vector": "Array(Float32)"}, "MergeTree", "id")
+
+    query = clickhouse_client.execute_query.call_args[0][0]
+    assert "vector_q Array(Int8)" in query
+    assert "vector_bits Array(UInt64)" in query
+
+
+def test_failed_restore_forgets_that_the_table_exists(rag_manager, tmp_path):
+    path = tmp_path / "backup.json"
+    path.write_text('[{"id": "1", "title": "First"}]')
+    backup_manager = rag_manager.backup_manager
+    rag_manager.client.execute_query = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title"])
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.table_manager.reset_table = MagicMock(side_effect=[RuntimeError("Unknown table"), None])
+
+    with pytest.raises(RuntimeError):
+        backup_manager.restore_from_file(str(path), {"id": "String", "title": "String"})
+    backup_manager.restore_from_file(str(path), {"id": "String", "title": "String"})
+
+    assert rag_manager.client.execute_query.call_count == 2
+    rag_manager.table_manager.insert_columnar.assert_called_once()
+
+
+def test_backup_to_excel_streams_rows(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String"), ("vector", "Array(Float32)")]
+    chunks = iter([[("1", "First", [0.1, 0.2])], [("2", "Second", [0.3, 0.4])]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    path = tmp_path / "backup.xlsx"
+
+    rag_manager.backup_database(str(path))
+
+    df = pd.read_excel(path, dtype=str)
+    assert list(df.columns) == ["id", "title", "vector"]
+    assert df["vector"].tolist() == ["[0.1, 0.2]", "[0.3, 0.4]"]
+
+
+def test_ndjson_backup_round_trip(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String")]
+    chunks = iter([[("1", "First")], [("2", "Second")]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title"])
+    path = tmp_path / "backup.ndjson"
+
+    rag_manager.backup_database(str(path))
+    with patch("clickhouserag.backup.managers.NDJSON_CHUNK_SIZE", 1):
+        rag_manager.restore_database(str(path))
+
+    assert rag_manager.table_manager.insert_columnar.call_args_list[0].args == ({"id": ("1",), "title": ("First",)},)
+    assert rag_manager.table_manager.insert_columnar.call_args_list[1].args == ({"id": ("2",), "title": ("Second",)},)
+
+
+def test_backup_to_parquet_shards_with_workers(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String")]
+    chunks = iter([[("1", "First")], [("2", "Second")]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    path = tmp_path / "backup.parquet"
+
+    with patch("clickhouserag.backup.managers.PARQUET_ROW_GROUP_ROWS", 1):
+        rag_manager.backup_database(str(path), max_workers=2)
+
+    assert sorted(p.name for p in path.iterdir()) == ["part-00000.parquet", "part-00001.parquet"]
+    assert sorted(pq.read_table(path).column("id").to_pylist()) == ["1", "2"]
+
+
+def test_initialize_table_issues_single_idempotent_ddl(rag_manager):
+    backup_manager = rag_manager.backup_manager
+    rag_manager.client.execute_query = MagicMock()
+
+    backup_manager._initialize_table({"id": "String"}, "MergeTree", "id")
+    backup_manager._initialize_table({"id": "String"}, "MergeTree", "id")
+
+    rag_manager.client.execute_query.assert_called_once_with("CREATE TABLE IF NOT EXISTS test_table (id String) ENGINE = MergeTree ORDER BY id SETTINGS min_bytes_for_wide_part = 0")
+
+
+def test_backup_to_parquet_uses_arrow_client(tmp_path):
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    client.client.query_arrow.return_value = pa.table({"id": ["1", "2"]})
+    backup_manager = BackupManager(client, ClickhouseTableManager(client, "test_table"))
+    path = tmp_path / "backup.parquet"
+
+    backup_manager.backup_to_file(str(path))
+
+    client.client.query_arrow.assert_called_once_with("SELECT * FROM test_table", parameters=None)
+    assert pq.read_table(path).column("id").to_pylist() == ["1", "2"]
+
+
+def test_restore_from_json_inserts_columns(rag_manager, tmp_path):
+    path = tmp_path / "backup.json"
+    path.write_text('[{"id": "1"}, {"id": "2"}]')
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title"])
+
+    rag_manager.restore_database(str(path))
+
+    rag_manager.table_manager.insert_columnar.assert_called_once_with({"id": ("1", "2")})
+
+
+def test_backup_to_csv_falls_back_for_array_columns(rag_manager, tmp_path):
+    columns = [("id", "String"), ("vector", "Array(Float32)")]
+    chunks = iter([[("1", [0.5, 1.0])]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    path = tmp_path / "backup.csv"
+
+    rag_manager.backup_database(str(path))
+
+    assert path.read_text().splitlines() == ["id,vector", '1,"[0.5, 1.0]"']
+
+
+def test_backup_to_json_streams_chunks(rag_manager, tmp_path):
+    columns = [("id", "String"), ("title", "String")]
+    chunks = iter([[("1", "First")], [("2", "Second")]])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=(columns, chunks))
+    rag_manager.table_manager.fetch_all = MagicMock()
+    path = tmp_path / "backup.json"
+
+    rag_manager.backup_database(str(path))
+
+    rag_manager.table_manager.fetch_all.assert_not_called()
+    assert json.loads(path.read_text()) == [{"id": "1", "title": "First"}, {"id": "2", "title": "Second"}]
+
+
+def test_native_backup_streams_raw_bytes(tmp_path):
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    client.client.raw_stream.return_value = io.BytesIO(b"native-bytes")
+    backup_manager = BackupManager(client, ClickhouseTableManager(client, "test_table"))
+    path = tmp_path / "backup.native"
+
+    backup_manager.backup_to_file(str(path))
+
+    client.client.raw_stream.assert_called_once_with("SELECT * FROM test_table", parameters=None, settings=None, fmt="Native")
+    assert path.read_bytes() == b"native-bytes"
+
+
+def test_json_backup_is_encoded_by_server_with_arrow_client(tmp_path):
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    client.client.raw_stream.return_value = io.BytesIO(b'[{"id":"1"}]')
+    backup_manager = BackupManager(client, ClickhouseTableManager(client, "test_table"))
+    path = tmp_path / "backup.json"
+
+    backup_manager.backup_to_file(str(path))
+
+    assert client.client.raw_stream.call_args.kwargs["fmt"] == "JSONEachRow"
+    assert client.client.raw_stream.call_args.kwargs["settings"]["output_format_json_array_of_rows"] == 1
+    assert json.loads(path.read_text()) == [{"id": "1"}]
+
+
+def test_restore_from_json_streams_batches(rag_manager, tmp_path):
+    path = tmp_path / "backup.json"
+    path.write_text('[{"id": "1"}, {"id": "2"}, {"id": "3"}]')
+    rag_manager.table_manager.reset_table = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title"])
+
+    with patch("clickhouserag.utils.JSON_READ_SIZE", 8), patch("clickhouserag.backup.managers.JSON_RESTORE_BATCH_SIZE", 2):
+        rag_manager.restore_database(str(path))
+
+    assert [call.args[0] for call in rag_manager.table_manager.insert_columnar.call_args_list] == [{"id": ("1", "2")}, {"id": ("3",)}]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[1.5e-10, -2.25E+3, 12345678901234567890, -0.0]",
+        '["a\\"b", "\\u00e9\\\\", "  , ] "]',
+        '[{"id": "1", "vector": [0.125, -1e-7]}, [[], {}], {"nested": {"flag": true, "none": null}}]',
+        "[\n  1,\n  2.5\n]",
+    ],
+)
+def test_load_json_array_handles_values_split_across_reads(tmp_path, text):
+    path = tmp_path / "backup.json"
+    path.write_text(text)
+
+    for read_size in range(1, len(text) + 1):
+        with patch("clickhouserag.utils.JSON_READ_SIZE", read_size):
+            assert list(load_json_array(str(path))) == json.loads(text)
@@ -1,3 +1,10 @@
+from unittest.mock import MagicMock, patch
+
+from clickhouserag.clickhouse.clients import (
+    ArrowClickhouseClient,
+    ClickhouseConnectClient,
+)
+
 
 def test_connect(clickhouse_client):
     clickhouse_client.connect()
@@ -21,3 +28,130 @@ def test_fetch_all(clickhouse_client):
 def test_close(clickhouse_client):
     clickhouse_client.close()
     clickhouse_client.close.assert_called_once()
+
+def test_fetch_all_returns_named_rows():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    client_cls.return_value.execute.return_value = ([(1, "First"), (2, "Second")], [("id", "UInt32"), ("title", "String")])
+    rows = client.fetch_all("SELECT id, title FROM test")
+    assert rows[0].id == 1
+    assert rows[1]._asdict() == {"id": 2, "title": "Second"}
+    assert type(rows[0]) is type(rows[1])
+
+def test_fetch_all_returns_plain_tuples_for_non_field_columns():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    client_cls.return_value.execute.return_value = ([(1, "First", 2)], [("_id", "UInt32"), ("title", "String"), ("order", "UInt8")])
+    assert client.fetch_all("SELECT _id, title, order FROM test") == [(1, "First", 2)]
+    assert type(client.fetch_all("SELECT _id, title, order FROM test")[0]) is tuple
+
+def test_arrow_client_fetch_all_arrow():
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    table = client.fetch_all_arrow("SELECT * FROM test")
+    client.client.query_arrow.assert_called_once_with("SELECT * FROM test", parameters=None)
+    assert table is client.client.query_arrow.return_value
+
+def test_arrow_client_insert_rows_uses_native_insert():
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    client.execute_query("INSERT INTO test VALUES", [{"id": 1, "title": "First"}, {"id": 2, "title": "Second"}])
+    client.client.insert.assert_called_once_with("test", [[1, 2], ["First", "Second"]], column_names=["id", "title"], column_oriented=True)
+
+def test_connect_fills_pool():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=3, compression="lz4")
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    assert client_cls.call_count == 3
+    assert client_cls.call_args.kwargs["compression"] == "lz4"
+    assert client._pool.qsize() == 3
+
+def test_fetch_column_uses_columnar_result():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    client_cls.return_value.execute.return_value = [(1, 2), ("First", "Second")]
+    assert client.fetch_column("SELECT id, title FROM test", 1) == ["First", "Second"]
+    client_cls.return_value.execute.assert_called_with("SELECT id, title FROM test", columnar=True, with_column_types=False)
+
+def test_fetch_one_limits_query_and_returns_dict():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    client_cls.return_value.execute.return_value = ([(1, "First")], [("id", "UInt32"), ("title", "String")])
+    assert client.fetch_one("SELECT id, title FROM test") == {"id": 1, "title": "First"}
+    client_cls.return_value.execute.assert_called_with("SELECT * FROM (SELECT id, title FROM test) LIMIT 1", columnar=False, with_column_types=True)
+    client_cls.return_value.execute_iter.assert_not_called()
+    client_cls.return_value.execute.return_value = ([], [("id", "UInt32"), ("title", "String")])
+    assert client.fetch_one("SELECT id, title FROM test") is None
+    assert client._pool.qsize() == 1
+
+def test_fetch_one_keeps_column_names_that_are_not_identifiers():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    client_cls.return_value.execute.return_value = ([(1, "x", 3)], [("_id", "UInt32"), ("title", "String"), ("order", "UInt8")])
+    assert client.fetch_one("SELECT _id, title, order FROM test") == {"_id": 1, "title": "x", "order": 3}
+
+def test_execute_iter_returns_client_to_pool():
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    driver = client_cls.return_value
+    driver.execute_iter.side_effect = lambda *args, **kwargs: iter([[("id", "UInt32")], (1,), (2,)])
+
+    columns, chunks = client.execute_iter("SELECT id FROM test", chunk_size=1)
+    assert columns == [("id", "UInt32")]
+    assert client._pool.qsize() == 0
+    assert list(chunks) == [[(1,)], [(2,)]]
+    assert client._pool.qsize() == 1
+
+    _, chunks = client.execute_iter("SELECT id FROM test")
+    del chunks
+    assert client._pool.qsize() == 1
+    driver.disconnect.assert_called_once()
+
+def test_insert_columnar_converts_numpy_columns():
+    import datetime
+
+    import pandas as pd
+
+    client = ClickhouseConnectClient("localhost", 9000, "test_user", "test_password", "test_db", pool_size=1)
+    with patch("clickhouserag.clickhouse.clients.Client") as client_cls:
+        client.connect()
+    df = pd.DataFrame({"id": [1, 2], "created": pd.to_datetime(["2024-01-01", "2024-01-02"])})
+    client.insert_columnar("test", {column: df[column] for column in df.columns})
+    client_cls.return_value.execute.assert_called_with(
+        "INSERT INTO test (id, created) VALUES",
+        [[1, 2], [datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)]],
+        columnar=True,
+        with_column_types=False,
+        types_check=False,
+    )
+
+def test_arrow_client_connect_uses_pooled_keepalive_connections():
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db", pool_size=8)
+    with patch("clickhouse_connect.get_client") as get_client:
+        client.connect()
+    kwargs = get_client.call_args.kwargs
+    assert kwargs["pool_mgr"].connection_pool_kw["maxsize"] == 8
+    assert kwargs["autogenerate_session_id"] is False
+
+def test_arrow_client_execute_iter_closes_unread_stream():
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    stream = client.client.query_row_block_stream.return_value
+    stream.__enter__.return_value = stream
+    stream.source.column_names = ["id"]
+    stream.source.column_types = [MagicMock()]
+    stream.source.column_types[0].name = "UInt32"
+
+    columns, chunks = client.execute_iter("SELECT id FROM test")
+    assert columns == [("id", "UInt32")]
+    stream.__enter__.assert_called_once()
+    stream.__exit__.assert_not_called()
+
+    chunks.close()
+    stream.__exit__.assert_called_once()
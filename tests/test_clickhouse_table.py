@@ -1,3 +1,9 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from clickhouserag.clickhouse.managers import ClickhouseTableManager
+
 
 def test_insert(table_manager, sample_data):
     table_manager.insert([sample_data])
@@ -35,3 +41,27 @@ def test_reset_table(table_manager):
     table_manager.reset_table()
     query = "TRUNCATE TABLE test_table"
     table_manager.client.execute_query.assert_called_once_with(query, None)
+
+def test_insert_columnar(table_manager):
+    columns = {"id": ["1", "2"], "title": ["First", "Second"]}
+    table_manager.client.insert_columnar = MagicMock()
+    table_manager.insert_columnar(columns)
+    table_manager.client.insert_columnar.assert_called_once_with("test_table", columns)
+
+def test_update_query_is_cached_per_key_set(table_manager):
+    table_manager.update({"title": "A", "text": "B"}, {"id": "1"})
+    table_manager.update({"text": "C", "title": "D"}, {"id": "2"})
+    first, second = (call.args[0] for call in table_manager.client.execute_query.call_args_list)
+    assert first is second
+    assert first == "ALTER TABLE test_table UPDATE text = %(text)s, title = %(title)s WHERE id = %(id)s"
+
+def test_insert_sends_generator_in_chunks(table_manager):
+    rows = ({"id": str(i)} for i in range(5))
+    table_manager.insert(rows, chunk_size=2)
+    calls = table_manager.client.execute_query.call_args_list
+    assert [len(call.args[1]) for call in calls] == [2, 2, 1]
+
+def test_invalid_table_name_is_rejected(clickhouse_client):
+    with pytest.raises(ValueError, match="Invalid table name"):
+        ClickhouseTableManager(clickhouse_client, "t; DROP TABLE users")
+    assert ClickhouseTableManager(clickhouse_client, "db.`my table`").table_name == "db.`my table`"
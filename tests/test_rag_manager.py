@@ -1,6 +1,16 @@
+import asyncio
+import time
+import uuid
 from unittest.mock import MagicMock, patch
 
 import numpy as np
+import pytest
+
+from clickhouserag.clickhouse.clients import ArrowClickhouseClient
+from clickhouserag.rag.cache import QueryCache, VectorCache
+from clickhouserag.rag.managers import RAGManager
+from clickhouserag.rag.schema import UPSERT_ENGINE, derived_columns
+from clickhouserag.utils import records_to_columns
 
 
 def test_initialize_table(rag_manager):
@@ -14,11 +24,62 @@ def test_add_data(rag_manager, sample_data):
     rag_manager.table_manager.insert.assert_called_once_with([sample_data])
 
 def test_add_bulk_data(rag_manager, sample_data):
-    rag_manager.table_manager.insert = MagicMock()
+    rag_manager.table_manager.insert_columnar = MagicMock()
     data_list = [sample_data, sample_data]
     with patch.object(rag_manager, "get_vectorizer", return_value=MagicMock(bulk_vectorize=lambda data: [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3]])):
         rag_manager.add_bulk_data(data_list, vectorizer_name="test_vectorizer")
-    rag_manager.table_manager.insert.assert_called_once_with(data_list)
+    rag_manager.table_manager.insert_columnar.assert_called_once()
+    assert list(rag_manager.table_manager.insert_columnar.call_args.args[0]) == ["id", "title", "vector"]
+    assert [data["vector"] for data in data_list] == [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3]]
+
+def test_add_bulk_data_rejects_keys_that_are_not_columns(rag_manager):
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    vectorizer = MagicMock(bulk_vectorize=lambda titles: [[0.1]] * len(titles))
+
+    with pytest.raises(ValueError, match="not table columns: \\['extra'\\]"):
+        rag_manager.add_bulk_data([{"id": "1", "title": "First", "extra": 1}], vectorizer=vectorizer)
+    rag_manager.table_manager.insert_columnar.assert_not_called()
+
+def test_records_to_columns_uses_table_columns():
+    assert records_to_columns([{"title": "First", "id": "1"}], ["id", "title", "vector"]) == {"id": ("1",), "title": ("First",)}
+    with pytest.raises(ValueError, match="Record 0 has no 'title' key"):
+        records_to_columns([{"id": "1"}, {"id": "2", "title": "Second"}], ["id", "title"])
+
+def test_add_bulk_data_inserts_in_batches(rag_manager):
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    data_list = [{"id": str(i), "title": f"Title {i}"} for i in range(5)]
+    vectorizer = MagicMock(bulk_vectorize=lambda titles: [[0.1]] * len(titles))
+    rag_manager.add_bulk_data(data_list, vectorizer=vectorizer, batch_size=2)
+    batches = [call.args[0]["id"] for call in rag_manager.table_manager.insert_columnar.call_args_list]
+    assert batches == [("0", "1"), ("2", "3"), ("4",)]
+
+def test_add_bulk_data_pipelines_vectorization(rag_manager):
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    data_list = [{"id": str(i), "title": f"Title {i}"} for i in range(5)]
+    vectorizer = MagicMock()
+    vectorizer.bulk_vectorize.side_effect = lambda titles: [[0.1]] * len(titles)
+
+    rag_manager.add_bulk_data(data_list, vectorizer=vectorizer, batch_size=2, pipeline=True)
+
+    assert vectorizer.bulk_vectorize.call_count == 3
+    batches = [call.args[0]["id"] for call in rag_manager.table_manager.insert_columnar.call_args_list]
+    assert batches == [("0", "1"), ("2", "3"), ("4",)]
+    assert all(data["vector"] == [0.1] for data in data_list)
+
+def test_add_bulk_data_sends_arrow_with_arrow_client():
+    client = ArrowClickhouseClient("localhost", 8123, "test_user", "test_password", "test_db")
+    client.client = MagicMock()
+    rag_manager = RAGManager(client, "test_table")
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title", "vector", "vector_norm"])
+    vectorizer = MagicMock(bulk_vectorize=lambda titles: np.ones((len(titles), 3), dtype=np.float32))
+
+    rag_manager.add_bulk_data([{"id": "1", "title": "First"}, {"id": "2", "title": "Second"}], vectorizer=vectorizer)
+
+    table_name, arrow_table = client.client.insert_arrow.call_args.args
+    assert table_name == "test_table"
+    assert arrow_table.column("id").to_pylist() == ["1", "2"]
+    assert arrow_table.column("vector").to_pylist() == [[1.0, 1.0, 1.0], [1.0, 1.0, 1.0]]
+    assert str(arrow_table.schema.field("vector").type) == "list<item: float>"
 
 def test_delete_data(rag_manager):
     rag_manager.table_manager.delete = MagicMock()
@@ -39,6 +100,12 @@ def test_search(rag_manager):
     rag_manager.search(query)
     rag_manager.table_manager.search.assert_called_once_with(query)
 
+def test_search_with_similarity_passes_embedding_and_top_k(rag_manager, sample_data):
+    rag_manager.similarity_search = MagicMock(return_value=[])
+    embedding = np.array(sample_data["vector"])
+    rag_manager.search(embedding, similarity=True, top_k=3)
+    rag_manager.similarity_search.assert_called_once_with(embedding=embedding, columns=["id", "title", "vector"], top_k=3)
+
 def test_similarity_search(rag_manager, sample_data):
     embedding = np.array(sample_data["vector"])
     columns = ["id", "title", "cosine_distance"]
@@ -54,8 +121,294 @@ def test_reset_database(rag_manager):
     rag_manager.table_manager.reset_table.assert_called_once()
 
 def test_backup_database(rag_manager):
-    rag_manager.table_manager.fetch_all = MagicMock(return_value=[])
+    rag_manager.table_manager.fetch_iter = MagicMock(return_value=([], iter([])))
     path = "backup.json"
     with patch("logging.Logger.info"):
         rag_manager.backup_database(path)
 
+
+def test_similarity_search_uses_stored_norm(rag_manager):
+    rag_manager.client.execute_query = MagicMock(return_value=[("1", 0.9)])
+    results = rag_manager.similarity_search(np.array([3.0, 4.0]), ["id"], 1)
+    query, = rag_manager.client.execute_query.call_args.args
+    params = rag_manager.client.execute_query.call_args.kwargs["params"]
+    assert "dotProduct(vector, query_vector) / vector_norm" in query
+    assert "sqrt" not in query
+    assert "WITH [0.600000024,0.800000012] AS query_vector" in query
+    assert params == {"top_k": 1}
+    assert results == [{"id": "1", "cosine_distance": 0.9}]
+
+def test_similarity_search_reuses_query_template(rag_manager):
+    rag_manager.client.execute_query = MagicMock(return_value=[])
+
+    rag_manager.similarity_search(np.array([1.0, 0.0]), ["id"], None)
+    rag_manager.similarity_search(np.array([0.0, 1.0]), ["id"], None)
+
+    first, second = (call.args[0] for call in rag_manager.client.execute_query.call_args_list)
+    assert first.startswith("WITH [1,0] AS query_vector SELECT id,")
+    assert first.split(" AS query_vector", 1)[1] == second.split(" AS query_vector", 1)[1]
+    assert "LIMIT" not in first
+
+def test_similarity_search_uses_vector_index(clickhouse_client):
+    clickhouse_client.execute_query.return_value = []
+    schema = {"id": "String", "vector": "Array(Float32)"}
+    rag_manager = RAGManager(clickhouse_client, "test_table", schema, vector_index_dimensions=2)
+    create_query = clickhouse_client.execute_query.call_args.args[0]
+    assert "INDEX vector_index vector TYPE vector_similarity('hnsw', 'cosineDistance', 2)" in create_query
+
+    rag_manager.similarity_search(np.array([3.0, 4.0]), ["id"], 5)
+
+    query = clickhouse_client.execute_query.call_args.args[0]
+    assert query.endswith("ORDER BY cosineDistance(vector, query_vector) LIMIT %(top_k)s")
+
+def test_create_table_adds_vector_norm(rag_manager):
+    rag_manager.client.execute_query = MagicMock()
+    rag_manager._create_table({"id": "String", "vector": "Array(Float32)"}, "MergeTree", "id")
+    query = rag_manager.client.execute_query.call_args.args[0]
+    assert query.startswith("CREATE TABLE IF NOT EXISTS test_table (")
+    assert query.endswith("vector Array(Float32), vector_norm Float32 MATERIALIZED L2Norm(vector)) ENGINE = MergeTree ORDER BY id SETTINGS min_bytes_for_wide_part = 0")
+
+def test_initialize_new_table_creates_it_without_migrating(clickhouse_client):
+    clickhouse_client.execute_query.return_value = []
+    RAGManager(clickhouse_client, "test_table", {"id": "String", "vector": "Array(Float32)"}, vector_index_dimensions=2)
+    probe, create = (call.args[0] for call in clickhouse_client.execute_query.call_args_list)
+    assert probe.startswith("SELECT name FROM system.columns")
+    assert create.startswith("CREATE TABLE IF NOT EXISTS test_table (")
+
+def test_initialize_table_skips_migration_when_nothing_is_missing(rag_manager):
+    rag_manager.client.execute_query = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title", "vector", "vector_norm"])
+    rag_manager._initialize_table(rag_manager.table_schema, rag_manager.engine, rag_manager.order_by)
+    rag_manager.client.execute_query.assert_not_called()
+
+def test_initialize_table_adds_missing_derived_columns_and_index(rag_manager):
+    rag_manager.vector_index_dimensions = 3
+    rag_manager.client.execute_query = MagicMock()
+    rag_manager.table_manager.column_names = MagicMock(return_value=["id", "title", "vector"])
+    rag_manager.table_manager.index_names = MagicMock(return_value=[])
+    rag_manager._initialize_table(rag_manager.table_schema, rag_manager.engine, rag_manager.order_by)
+    queries = [call.args[0] for call in rag_manager.client.execute_query.call_args_list]
+    assert queries[0] == "ALTER TABLE test_table ADD COLUMN IF NOT EXISTS vector_norm Float32 MATERIALIZED L2Norm(vector)"
+    assert queries[1].startswith("ALTER TABLE test_table ADD INDEX IF NOT EXISTS vector_index vector")
+    assert len(queries) == 2
+
+def test_similarity_search_quantized(rag_manager):
+    rag_manager.quantize_vectors = True
+    rag_manager.client.execute_query = MagicMock(return_value=[])
+    rag_manager.similarity_search(np.array([3.0, 4.0]), ["id"], 1)
+    query, = rag_manager.client.execute_query.call_args.args
+    params = rag_manager.client.execute_query.call_args.kwargs["params"]
+    assert "vector_q" in query
+    assert "WITH [95,127] AS query_vector" in query
+    assert params["query_scale"] == pytest.approx(0.8 / 127)
+
+def test_similarity_search_uses_query_cache(rag_manager):
+    rag_manager.query_cache = QueryCache(maxsize=8)
+    rag_manager.client.execute_query = MagicMock(return_value=[("1", 0.9)])
+    first = rag_manager.similarity_search(np.array([3.0, 4.0]), ["id"], 1)
+    second = rag_manager.similarity_search(np.array([6.0, 8.0]), ["id"], 1)
+    assert first == second
+    rag_manager.client.execute_query.assert_called_once()
+    assert rag_manager.query_cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    rag_manager.table_manager.delete = MagicMock()
+    rag_manager.delete_data("1")
+    assert len(rag_manager.query_cache) == 0
+
+def test_query_cache_expires_entries():
+    cache = QueryCache(maxsize=1, ttl=60)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert cache.get("a") is None
+    with patch("clickhouserag.rag.cache.time.monotonic", return_value=time.monotonic() + 61):
+        assert cache.get("b") is None
+
+def test_async_similarity_searches_run_concurrently(rag_manager):
+    rag_manager.client.execute_query = MagicMock(return_value=[("1", 0.9)])
+
+    async def search_all():
+        return await asyncio.gather(*(rag_manager.asimilarity_search(np.array([1.0, float(i)]), ["id"], 1) for i in range(3)))
+
+    results = asyncio.run(search_all())
+    assert results == [[{"id": "1", "cosine_distance": 0.9}]] * 3
+    assert rag_manager.client.execute_query.call_count == 3
+
+def test_update_data_reinserts_on_replacing_merge_tree(clickhouse_client):
+    clickhouse_client.execute_query.return_value = []
+    rag_manager = RAGManager(clickhouse_client, "test_table", {"id": "String", "title": "String"}, engine=UPSERT_ENGINE)
+    create_query = clickhouse_client.execute_query.call_args.args[0]
+    assert "version UInt64 DEFAULT" in create_query
+    assert create_query.endswith("is_deleted UInt8 DEFAULT 0) ENGINE = ReplacingMergeTree(version, is_deleted) ORDER BY id SETTINGS min_bytes_for_wide_part = 0")
+
+    clickhouse_client.fetch_one.return_value = {"id": "1", "title": "Old", "version": 1}
+    rag_manager.table_manager.insert = MagicMock()
+    rag_manager.table_manager.update = MagicMock()
+    rag_manager.update_data("1", {"id": "1", "title": "New"})
+
+    rag_manager.table_manager.update.assert_not_called()
+    assert clickhouse_client.fetch_one.call_args.args[0] == "SELECT id, title FROM test_table FINAL WHERE id = %(data_id)s"
+    row, = rag_manager.table_manager.insert.call_args.args[0]
+    assert row["title"] == "New"
+    assert row["version"] > 1
+
+def test_add_bulk_data_rejects_records_without_id(rag_manager):
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    vectorizer = MagicMock(bulk_vectorize=lambda titles: [[0.1]] * len(titles))
+    with pytest.raises(ValueError, match="'id' field, record 1"):
+        rag_manager.add_bulk_data([{"id": "1", "title": "A"}, {"title": "B"}], vectorizer=vectorizer)
+    rag_manager.table_manager.insert_columnar.assert_not_called()
+
+def test_delete_data_inserts_tombstone_on_replacing_merge_tree(clickhouse_client):
+    clickhouse_client.execute_query.return_value = [("id",), ("version",), ("is_deleted",)]
+    rag_manager = RAGManager(clickhouse_client, "test_table", {"id": "String"}, engine=UPSERT_ENGINE)
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.table_manager.delete = MagicMock()
+
+    rag_manager.delete_data("1")
+
+    rag_manager.table_manager.delete.assert_not_called()
+    columns = rag_manager.table_manager.insert_columnar.call_args.args[0]
+    assert columns["id"] == ["1"]
+    assert columns["is_deleted"] == [1]
+
+def test_initialize_existing_table_reads_columns_once(clickhouse_client):
+    clickhouse_client.execute_query.return_value = [("id",), ("vector",), ("vector_norm",)]
+    RAGManager(clickhouse_client, "test_db.test_table", {"id": "String", "vector": "Array(Float32)"})
+
+    query, params = clickhouse_client.execute_query.call_args.args
+    clickhouse_client.execute_query.assert_called_once()
+    assert query.startswith("SELECT name FROM system.columns")
+    assert params == {"table": "test_table", "database": "test_db"}
+
+def test_set_data_inserts_without_lookup_on_replacing_merge_tree(clickhouse_client):
+    clickhouse_client.execute_query.return_value = [("id",), ("title",), ("version",), ("is_deleted",)]
+    rag_manager = RAGManager(clickhouse_client, "test_table", {"id": "String", "title": "String"}, engine=UPSERT_ENGINE)
+    rag_manager.table_manager.insert = MagicMock()
+
+    rag_manager.set_data({"id": "1", "title": "New"})
+
+    clickhouse_client.fetch_one.assert_not_called()
+    row, = rag_manager.table_manager.insert.call_args.args[0]
+    assert row["title"] == "New"
+    assert "version" in row
+
+def test_upsert_row_inserts_send_every_insertable_column(clickhouse_client):
+    clickhouse_client.execute_query.return_value = [("id",), ("title",), ("version",), ("is_deleted",)]
+    schema = {"id": "String", "title": "String"}
+    rag_manager = RAGManager(clickhouse_client, "test_table", schema, engine=UPSERT_ENGINE)
+    rag_manager.table_manager.insert = MagicMock()
+    clickhouse_client.fetch_one.return_value = {"id": "1", "title": "Old"}
+    # A VALUES insert without a column list expects every column that is not MATERIALIZED.
+    sample_block = {*schema, *(column.split(" ", 1)[0] for column in derived_columns(schema, engine=UPSERT_ENGINE) if " MATERIALIZED " not in column)}
+
+    rag_manager.add_data({"id": "1", "title": "New"})
+    rag_manager.update_data("1", {"id": "1", "title": "Newer"})
+
+    for call in rag_manager.table_manager.insert.call_args_list:
+        row, = call.args[0]
+        assert set(row) == sample_block
+        assert row["is_deleted"] == 0
+
+def test_similarity_search_binary_prefilter(clickhouse_client):
+    clickhouse_client.execute_query.return_value = []
+    schema = {"id": "String", "vector": "Array(Float32)"}
+    rag_manager = RAGManager(clickhouse_client, "test_table", schema, binary_vectors=True)
+    assert "vector_bits Array(UInt64) MATERIALIZED" in clickhouse_client.execute_query.call_args.args[0]
+
+    rag_manager.similarity_search(np.array([3.0, -4.0]), ["id"], 2, prefilter=True)
+
+    query = clickhouse_client.execute_query.call_args.args[0]
+    params = clickhouse_client.execute_query.call_args.kwargs["params"]
+    assert query.startswith("WITH [0.600000024,-0.800000012] AS query_vector, [1] AS query_bits SELECT")
+    assert "id IN (SELECT id FROM test_table ORDER BY arraySum((x, y) -> bitCount(bitXor(x, y)), vector_bits, query_bits)" in query
+    assert params == {"top_k": 2, "candidates": 20}
+    with pytest.raises(ValueError, match="top_k"):
+        rag_manager.similarity_search(np.array([3.0, -4.0]), ["id"], None, prefilter=True)
+
+def test_similarity_search_ranks_cached_vectors_locally(clickhouse_client):
+    rag_manager = RAGManager(clickhouse_client, "test_table", vector_cache=VectorCache())
+    clickhouse_client.execute_query.side_effect = [
+        [("a", [1.0, 0.0]), ("b", [0.0, 1.0]), ("c", [3.0, 1.0])],
+        [("c", "Third"), ("a", "First")],
+        [("a", "First")],
+    ]
+
+    results = rag_manager.similarity_search(np.array([2.0, 0.0]), ["title"], 2)
+    rag_manager.similarity_search(np.array([1.0, 0.0]), ["title"], 1)
+
+    assert [result["title"] for result in results] == ["First", "Third"]
+    assert results[1]["cosine_distance"] == pytest.approx(3 / np.sqrt(10))
+    assert clickhouse_client.execute_query.call_args_list[0].args == ("SELECT id, vector FROM test_table",)
+    assert clickhouse_client.execute_query.call_args_list[1].kwargs["params"] == {"ids": ("a", "c")}
+    assert clickhouse_client.execute_query.call_count == 3
+
+def test_vector_cache_persists_vectors(tmp_path):
+    path = str(tmp_path / "vectors.npy")
+    query = np.array([1.0, 0.0], dtype=np.float32)
+    VectorCache(path).search(query, 1, lambda: (["a", "b"], [[0.0, 2.0], [2.0, 0.0]]))
+
+    cache = VectorCache(path)
+    assert cache.search(query, 1, MagicMock(side_effect=AssertionError)) == (["b"], [1.0])
+
+    cache.clear()
+    assert not (tmp_path / "vectors.npy").exists()
+
+def test_vector_cache_persists_uuid_ids(tmp_path, clickhouse_client):
+    ids = [uuid.uuid4(), uuid.uuid4()]
+    path = str(tmp_path / "vectors.npy")
+    VectorCache(path).search(np.array([1.0, 0.0]), 1, lambda: (ids, [[0.0, 2.0], [2.0, 0.0]]))
+
+    rag_manager = RAGManager(clickhouse_client, "test_table", vector_cache=VectorCache(path))
+    clickhouse_client.execute_query.side_effect = [[(ids[1], "Second")], [(ids[0], "First"), (ids[1], "Second")]]
+
+    assert rag_manager.similarity_search(np.array([1.0, 0.0]), ["title"], 1) == [{"title": "Second", "cosine_distance": 1.0}]
+    assert clickhouse_client.execute_query.call_args.kwargs["params"] == {"ids": (str(ids[1]),)}
+    results = rag_manager.similarity_search(np.array([0.0, 1.0]), ["title"], None)
+    assert [result["title"] for result in results] == ["First", "Second"]
+    assert clickhouse_client.execute_query.call_args.args == ("SELECT id, title FROM test_table",)
+
+def test_get_data_many_fetches_rows_in_one_query(rag_manager):
+    rag_manager.client.execute_query.return_value = [("1", "First", [0.1]), ("2", "Second", [0.2])]
+    rag_manager.client.execute_query.reset_mock()
+
+    assert rag_manager.get_data_many(iter(["1", "2"])) == [
+        {"id": "1", "title": "First", "vector": [0.1]},
+        {"id": "2", "title": "Second", "vector": [0.2]},
+    ]
+    assert rag_manager.get_data_many([]) == []
+
+    query, = rag_manager.client.execute_query.call_args.args
+    assert query.endswith("WHERE id IN %(data_ids)s")
+    assert rag_manager.client.execute_query.call_args.kwargs["params"] == {"data_ids": ("1", "2")}
+    rag_manager.client.execute_query.assert_called_once()
+
+def test_get_data_many_takes_names_from_result_without_schema(clickhouse_client):
+    rag_manager = RAGManager(clickhouse_client, "test_table")
+    clickhouse_client.execute_iter = MagicMock(return_value=([("_id", "UInt32"), ("order", "UInt8")], iter([[(1, 2)]])))
+
+    assert rag_manager.get_data_many([1]) == [{"_id": 1, "order": 2}]
+
+def test_set_bulk_data_inserts_new_rows_together(rag_manager):
+    existing_id = uuid.uuid4()
+    rag_manager.client.execute_query.return_value = [(existing_id, "Old", [0.1])]
+    rag_manager.table_manager.insert_columnar = MagicMock()
+    rag_manager.update_data = MagicMock()
+    old = {"id": str(existing_id), "title": "Old", "vector": [0.1]}
+
+    rag_manager.set_bulk_data([old, {"id": "2", "title": "New", "vector": [0.2]}, {"id": "3", "title": "New", "vector": [0.3]}])
+
+    rag_manager.table_manager.insert_columnar.assert_called_once_with(
+        {"id": ("2", "3"), "title": ("New", "New"), "vector": ([0.2], [0.3])}
+    )
+    rag_manager.update_data.assert_called_once_with(str(existing_id), old, None)
+
+def test_set_bulk_data_without_vectorizer_on_replacing_merge_tree(clickhouse_client):
+    clickhouse_client.execute_query.return_value = [("id",), ("title",), ("version",), ("is_deleted",)]
+    rag_manager = RAGManager(clickhouse_client, "test_table", {"id": "String", "title": "String"}, engine=UPSERT_ENGINE)
+    rag_manager.table_manager.insert_columnar = MagicMock()
+
+    rag_manager.set_bulk_data([{"id": "1", "title": "First"}, {"id": "2", "title": "Second"}])
+
+    columns, = rag_manager.table_manager.insert_columnar.call_args.args
+    assert columns["id"] == ("1", "2")
+    assert len(set(columns["version"])) == 1
@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from clickhouserag.utils.similarity import (
+    binary_quantize,
+    compute_cosine_similarity,
+    quantize_int8,
+    vector_literal,
+)
+
+
+def test_compute_cosine_similarity():
+    assert compute_cosine_similarity([1.0, 0.0], [1.0, 0.0]) == pytest.approx(1.0)
+    assert compute_cosine_similarity([1.0, 0.0], np.array([0.0, 1.0])) == pytest.approx(0.0)
+    assert compute_cosine_similarity([1.0, 2.0], [-1.0, -2.0]) == pytest.approx(-1.0)
+
+def test_compute_cosine_similarity_zero_vector():
+    assert compute_cosine_similarity([0.0, 0.0], [1.0, 2.0]) == 0.0
+
+def test_compute_cosine_similarity_rejects_length_mismatch():
+    with pytest.raises(ValueError, match="different lengths"):
+        compute_cosine_similarity([1.0, 0.0], [1.0, 0.0, 0.0])
+
+def test_compute_cosine_similarity_uses_simsimd():
+    simsimd = MagicMock()
+    simsimd.cosine.return_value = 0.25
+    with patch("clickhouserag.utils.similarity.simsimd", simsimd):
+        assert compute_cosine_similarity([1.0, 2.0], [2.0, 1.0]) == pytest.approx(0.75)
+        assert compute_cosine_similarity([0.0, 0.0], [2.0, 1.0]) == 0.0
+    simsimd.cosine.assert_called_once()
+
+def test_compute_cosine_similarity_passes_int8_to_simsimd():
+    simsimd = MagicMock()
+    simsimd.cosine.return_value = 0.0
+    vector = np.array([1, -2, 3], dtype=np.int8)
+    with patch("clickhouserag.utils.similarity.simsimd", simsimd):
+        assert compute_cosine_similarity(vector, vector) == 1.0
+    assert {arg.dtype for arg in simsimd.cosine.call_args.args} == {np.dtype(np.int8)}
+
+def test_quantize_int8():
+    quantized, scale = quantize_int8([0.5, -1.0, 0.25])
+    assert quantized.tolist() == [64, -127, 32]
+    assert quantized * scale == pytest.approx([0.5, -1.0, 0.25], abs=scale)
+    assert quantize_int8([0.0, 0.0])[1] == 0.0
+
+def test_vector_literal_round_trips_float32():
+    vector = np.random.default_rng(0).random(64, dtype=np.float32)
+    literal = vector_literal(vector)
+    assert np.array_equal(np.array(literal[1:-1].split(","), dtype=np.float32), vector)
+    assert vector_literal(np.array([1, -2], dtype=np.int8)) == "[1,-2]"
+
+def test_binary_quantize_packs_sign_bits():
+    vector = np.full(70, -1.0)
+    vector[[0, 3, 64, 69]] = 1.0
+    assert binary_quantize(vector).tolist() == [0b1001, 0b100001]